@@ -18,6 +18,49 @@ import sys
 from pyDAG3.Tables import LookupTable
 from pyDAG3.TextProcessing import InFile
 from pyDAG3.Dynamics import ode
+from pyDAG3.Dynamics.executive import Executive
+from pyDAG3.Dynamics.trim import newton
+from pyDAG3.Dynamics.linearize import linearize
+from pyDAG3.Dynamics.loggers import ColumnLogger, columns_to_csv
+
+
+# Order of the parameter array p of rotor_derivs
+ROTOR_PARAMS = ('qmrload', 'qtrload', 'qgas1', 'qgas2', 'qgas3', 'nomnp', 'jmr', 'jtr', 'jt', 'j1', 'j2', 'j3',
+                'Kmr', 'Ktr', 'K1', 'K2', 'K3', 'damcoef', 'datcoef', 'dlagm', 'Dht', 'dp1', 'dp2', 'dp3')
+
+
+def rotor_derivs(p, past_values):
+    """SimpleThreeEngineRotor.derivs over parameter array p, for pyDAG3.Dynamics.jit"""
+    qmrload, qtrload, qgas1, qgas2, qgas3, nomnp, jmr, jtr, jt, j1, j2, j3, \
+        kmr, ktr, k1, k2, k3, damcoef, datcoef, dlagm, dht, dp1, dp2, dp3 = p
+    n_mr, n_tr, nt, n1, n2, n3, qmr, qtr, q1, q2, q3 = past_values
+    d_nmr = (-qmrload + qmr - (n_mr - nt) * dlagm - damcoef * qmrload / max(n_mr, 1) * (
+                n_mr - nomnp)) / jmr
+    d_ntr = (-qtrload + qtr - (n_tr - nt) * dht - datcoef * qtrload / max(n_tr, 1) * (
+                n_tr - nomnp)) / jtr
+    d_nt = (q1 + q2 + q3 - qmr - qtr
+            - (nt - n1) * dp1 - (nt - n2) * dp2 - (nt - n3) * dp3 - (nt - n_mr) * dlagm - (
+                       nt - n_tr) * dht) / jt
+    dn1 = (qgas1 - q1 - (n1 - nt) * dp1) / j1
+    dn2 = (qgas2 - q2 - (n2 - nt) * dp2) / j2
+    dn3 = (qgas3 - q3 - (n3 - nt) * dp3) / j3
+    d_qmr = (nt - n_mr) * kmr
+    d_qtr = (nt - n_tr) * ktr
+    d_q1 = (n1 - nt) * k1
+    d_q2 = (n2 - nt) * k2
+    d_q3 = (n3 - nt) * k3
+    return d_nmr, d_ntr, d_nt, dn1, dn2, dn3, d_qmr, d_qtr, d_q1, d_q2, d_q3
+
+
+# Logged columns after time, see SimpleThreeEngineRotor.log_values
+LOG_NAMES = ('alt', 'vknot', 'gvw', 'dynang', 'n_mr', 'n_tr', 'nt', 'n1', 'n2', 'n3', 'qmr', 'qtr', 'q1', 'q2', 'q3',
+             'qgas1', 'qgas2', 'qgas3', 'qtotload', 'qmrload', 'qtrload')
+
+
+# Attributes saved by SimpleThreeEngineRotor.snapshot besides y and yp
+SNAPSHOT_NAMES = ('count', 'time', 'n_mr', 'n_tr', 'nt', 'n1', 'n2', 'n3', 'qmr', 'qtr', 'q1', 'q2', 'q3',
+                  'qmrload', 'qtrload', 'qgas1', 'qgas2', 'qgas3', 'qtotload', 'd_nmr', 'hptot', 'hpmr', 'hptr',
+                  'alt', 'vknot', 'oatf', 'gvw', 'dynang')
 
 
 class SimpleThreeEngineRotor:
@@ -157,6 +200,57 @@ class SimpleThreeEngineRotor:
         d_q3 = (n3 - nt) * self.K3
         return d_nmr, d_ntr, d_nt, dn1, dn2, dn3, d_qmr, d_qtr, d_q1, d_q2, d_q3
 
+    def param_array(self):
+        """Parameters and inputs in the order of ROTOR_PARAMS, for rotor_derivs
+
+        Parity of compiled and method derivatives:
+        >>> from pyDAG3.Dynamics.jit import CompiledModel
+        >>> r_m = SimpleThreeEngineRotor(0.006)
+        >>> r_m.assign_states(14280, 3432.25, 314.543, 1300., 1250., 1200.)
+        >>> r_m.assign_inputs(3432.25, 314.543, 1300., 1250., 1200.)
+        >>> c_m = CompiledModel(rotor_derivs, r_m.param_array(), r_m.yp, r_m.ylims)
+        >>> for i in range(500):
+        ...     ode.rk4(r_m, r_m.d_time)
+        ...     r_m.update()
+        ...     ode.rk4(c_m, r_m.d_time)
+        ...     c_m.yp = [x for x in c_m.y]
+        >>> [float(x) for x in c_m.y] == r_m.y
+        True
+        """
+        return [getattr(self, name) for name in ROTOR_PARAMS]
+
+    def snapshot(self):
+        """Dictionary of states, past values, call count and inputs, for restore
+
+        >>> r_m = SimpleThreeEngineRotor(0.006)
+        >>> r_m.assign_states(14280, 3432.25, 314.543, 1300., 1250., 1200.)
+        >>> r_m.assign_inputs(3432.25, 314.543, 1300., 1250., 1200.)
+        >>> ode.rk4(r_m, r_m.d_time)
+        >>> r_m.update()
+        >>> snap = r_m.snapshot()
+        >>> ode.rk4(r_m, r_m.d_time)
+        >>> r_m.update()
+        >>> y_next = r_m.y
+        >>> r_m.restore(snap)
+        >>> r_m.count
+        1
+        >>> ode.rk4(r_m, r_m.d_time)
+        >>> r_m.update()
+        >>> r_m.y == y_next
+        True
+        """
+        snap = dict((name, getattr(self, name)) for name in SNAPSHOT_NAMES)
+        snap['y'] = [x for x in self.y]
+        snap['yp'] = [x for x in self.yp]
+        return snap
+
+    def restore(self, snap):
+        """Return to a snapshot"""
+        for name in SNAPSHOT_NAMES:
+            setattr(self, name, snap[name])
+        self.y = [x for x in snap['y']]
+        self.yp = [x for x in snap['yp']]
+
     def assign_states(self, n0, qmrload, qtrload, qgas1, qgas2, qgas3):
         """Initialize the state past values"""
         self.yp = [n0, n0, n0, n0, n0, n0, qmrload, qtrload, qgas1, qgas2, qgas3]
@@ -486,6 +580,53 @@ class SimpleThreeEngineRotor:
         self.qtrload = self.hptr / self.n_tr * 5252.1131
         return self.qtotload, self.qmrload, self.qtrload
 
+    def trim(self, alt, vknot, oatf, gvw, clp, qgas=None):
+        """Newton solve for states y with all derivatives zero at the operating point,
+        with loads varying as horsepower over speed.  Gas torques qgas default to the
+        total load at nomnp split evenly.  Assigns y, yp and inputs; returns y"""
+        n0 = self.nomnp
+        self.n_mr = n0
+        self.n_tr = n0
+        (qtotload, qmrload, qtrload) = self.load_lookup(alt, vknot, oatf, gvw, clp)
+        if qgas is None:
+            qgas = [(qmrload + qtrload) / 3] * 3
+        qgas1, qgas2, qgas3 = qgas
+        hpmr = self.hpmr
+        hptr = self.hptr
+
+        def residual(y):
+            self.assign_inputs(hpmr / max(y[0], 1) * 5252.1131, hptr / max(y[1], 1) * 5252.1131,
+                               qgas1, qgas2, qgas3)
+            return self.derivs(y)
+
+        y0 = [n0, n0, n0, n0, n0, n0, qmrload, qtrload, qgas1, qgas2, qgas3]
+        y, iterations = newton(residual, y0)
+        residual(y)
+        self.y = y
+        self.yp = [x for x in y]
+        self.n_mr, self.n_tr, self.nt, self.n1, self.n2, self.n3, self.qmr, self.qtr, self.q1, self.q2, self.q3 = y
+        return y
+
+    def linearize(self, alt, vknot, oatf, gvw, clp, qgas=None):
+        """State-space A, B, C, D about the trim point (see trim) with inputs
+        u = [qgas1, qgas2, qgas3, clp] and outputs y = states.  The load tables are
+        piecewise linear, so at a clp breakpoint B holds the mean of the two slopes.
+        Leaves the rotor trimmed"""
+        y0 = self.trim(alt, vknot, oatf, gvw, clp, qgas)
+        u0 = [self.qgas1, self.qgas2, self.qgas3, clp]
+        snap = self.snapshot()
+
+        def f(x, u):
+            self.n_mr = x[0]
+            self.n_tr = x[1]
+            (qtotload, qmrload, qtrload) = self.load_lookup(alt, vknot, oatf, gvw, u[3])
+            self.assign_inputs(qmrload, qtrload, u[0], u[1], u[2])
+            return self.derivs(x)
+
+        matrices = linearize(f, y0, u0)
+        self.restore(snap)
+        return matrices
+
     def update(self):
         self.n_mr = self.y[0]
         self.n_tr = self.y[1]
@@ -502,6 +643,12 @@ class SimpleThreeEngineRotor:
         self.time = self.count * self.d_time
         self.yp = [x for x in self.y]
 
+    def log_values(self):
+        """Values of LOG_NAMES, for a ColumnLogger"""
+        return (self.alt, self.vknot, self.gvw, self.dynang, self.n_mr, self.n_tr, self.nt, self.n1, self.n2,
+                self.n3, self.qmr, self.qtr, self.q1, self.q2, self.q3, self.qgas1, self.qgas2, self.qgas3,
+                self.qtotload, self.qmrload, self.qtrload)
+
     def __repr__(self):
         """print result"""
         if 1 == self.count:
@@ -546,21 +693,14 @@ def main():
 
     # Executive initialization
     nomnp = r_m.nomnp
-    i = 0
-    results_file = open('rotorModel.csv', 'w')
 
-    # Rotor initialization
-    (qtotload, qmrload, qtrload) = r_m.load_lookup(alt, vknot, oatf, gvw, zdynang)
-    q_total_actual = qmrload + qtrload
-    qgas1 = q_total_actual / 3
-    qgas2 = q_total_actual / 3
-    qgas3 = q_total_actual / 3
-    r_m.assign_states(nomnp, qmrload, qtrload, qgas1, qgas2, qgas3)
-
-    # Main time loop
-    while True:
-        time = i * d_time
+    # Rotor initialization, trimmed with load split evenly across engines
+    r_m.trim(alt, vknot, oatf, gvw, zdynang)
+    qgas1 = r_m.qgas1
+    qgas2 = r_m.qgas2
+    qgas3 = r_m.qgas3
 
+    def rotor_inputs(model, time):
         # Collective input
         if 8 > time > 5:
             ddynang = 10
@@ -572,21 +712,20 @@ def main():
         dynang = zdynang + ddynang
 
         # Lookup load model
-        (qtotload, qmrload, qtrload) = r_m.load_lookup(alt, vknot, oatf, gvw, dynang)
+        (qtotload_, qmrload_, qtrload_) = model.load_lookup(alt, vknot, oatf, gvw, dynang)
 
         # Assign inputs to rotor object
-        r_m.assign_inputs(qmrload, qtrload, qgas1, qgas2, qgas3)
-
-        # Integrate and update the rotor object
-        ode.rk4(r_m, d_time)
-        r_m.update()
-
-        # Write results
-        pcnr = r_m.n_mr / nomnp * 100
-        results_file.write(r_m.__repr__())
-        if final_time <= time:
-            break
-        i += 1
+        model.assign_inputs(qmrload_, qtrload_, qgas1, qgas2, qgas3)
+
+    # Main time loop
+    executive = Executive(d_time, final_time)
+    executive.add_model(r_m, rotor_inputs)
+    logger = ColumnLogger(None, LOG_NAMES, r_m.log_values)
+    executive.add_logger(logger)
+    time = executive.run()
+    with open('rotorModel.csv', 'w') as results_file:
+        columns_to_csv(logger.columns(), results_file)
+    pcnr = r_m.n_mr / nomnp * 100
 
     print('time=', time, 'vknot=', vknot, 'alt=', alt, 'pcnr=', pcnr, 'gvw=', gvw, 'clp=', zdynang)
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Parallel parameter sweep of the GE38 rotor model
+Each case trims SimpleThreeEngineRotor at an operating point, steps collective
+by a schedule, and logs to memory; all cases are gathered into one columnar
+dataset with a 'case' column indexing the list of cases.
+python rotorSweep.py
+>>> cases = grid(alt=[0, 3000], gvw=[46000], clp=[70], steps=[(1, 2, 10)], final_time=3)
+>>> len(cases)
+2
+>>> dataset = sweep(cases, processes=2)
+>>> np.unique(dataset['case'])
+array([0., 1.])
+>>> len(dataset['time'])
+1002
+>>> [round(x, 1) for x in droop(dataset, len(cases))]
+[94.0, 94.1]
+"""
+import contextlib
+import io
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from pyDAG3.Dynamics.executive import Executive
+from pyDAG3.Dynamics.loggers import ColumnLogger, write_columns
+from rotorModel import SimpleThreeEngineRotor, LOG_NAMES
+
+# Per process rotor with curves loaded once, see _init_worker
+_rotor = None
+_rotor_loaded = None
+
+
+def grid(alt=(3000,), vknot=(0.01,), oatf=(59,), gvw=(46000,), clp=(70,), steps=(), final_time=30, d_time=0.006,
+         decimation=1):
+    """List of cases over all combinations of operating points, each with the same
+    collective steps, a list of (start time, end time, collective change)"""
+    return [{'alt': a, 'vknot': v, 'oatf': o, 'gvw': g, 'clp': c, 'steps': list(steps), 'final_time': final_time,
+             'd_time': d_time, 'decimation': decimation}
+            for a, v, o, g, c in itertools.product(alt, vknot, oatf, gvw, clp)]
+
+
+def collective(steps, time):
+    """Collective change at time from a schedule of (start time, end time, change)"""
+    ddynang = 0
+    for start, end, change in steps:
+        if end > time > start:
+            ddynang += change
+    return ddynang
+
+
+def _init_worker():
+    """Load the rotor curves once per process"""
+    global _rotor, _rotor_loaded
+    _rotor = SimpleThreeEngineRotor(0.006)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if _rotor.load_curves() == -1:
+            raise RuntimeError('failed to load rotorCurves')
+    _rotor_loaded = _rotor.snapshot()
+
+
+def run_case(case):
+    """Simulate one case; return dictionary of logged columns"""
+    if _rotor is None:
+        _init_worker()
+    r_m = _rotor
+    r_m.restore(_rotor_loaded)
+    r_m.d_time = case['d_time']
+    alt, vknot, oatf, gvw, clp = case['alt'], case['vknot'], case['oatf'], case['gvw'], case['clp']
+    steps = case['steps']
+    r_m.trim(alt, vknot, oatf, gvw, clp)
+    qgas1, qgas2, qgas3 = r_m.qgas1, r_m.qgas2, r_m.qgas3
+
+    def rotor_inputs(model, time):
+        (qtotload, qmrload, qtrload) = model.load_lookup(alt, vknot, oatf, gvw, clp + collective(steps, time))
+        model.assign_inputs(qmrload, qtrload, qgas1, qgas2, qgas3)
+
+    logger = ColumnLogger(None, LOG_NAMES, r_m.log_values)
+    executive = Executive(case['d_time'], case['final_time'])
+    executive.add_model(r_m, rotor_inputs)
+    executive.add_logger(logger, case['decimation'])
+    executive.run()
+    return logger.columns()
+
+
+def sweep(cases, processes=None):
+    """Run cases in a pool of processes (None for one per cpu, 1 for serial);
+    return one dataset of all cases' columns plus a 'case' column"""
+    if processes == 1:
+        results = [run_case(case) for case in cases]
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker) as pool:
+            results = list(pool.map(run_case, cases))
+    dataset = {'case': np.concatenate([np.full(len(result['time']), float(i)) for i, result in enumerate(results)])}
+    for name in results[0]:
+        dataset[name] = np.concatenate([result[name] for result in results])
+    return dataset
+
+
+def droop(dataset, num_cases, nomnp=14280.):
+    """Minimum main rotor speed of each case, percent"""
+    n_mr = dataset['n_mr']
+    case = dataset['case']
+    return [float(n_mr[case == i].min() / nomnp * 100) for i in range(num_cases)]
+
+
+def main():
+    cases = grid(alt=[0, 3000, 6000], gvw=[46000, 65500, 85000], clp=[50, 70], steps=[(5, 8, 10), (8, 11, -10)],
+                 final_time=15, decimation=5)
+    dataset = sweep(cases)
+    write_columns('rotorSweep.npy', dataset)
+    for case, pcnr_min in zip(cases, droop(dataset, len(cases))):
+        print('alt=', case['alt'], 'gvw=', case['gvw'], 'clp=', case['clp'], 'min pcnr=', pcnr_min)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
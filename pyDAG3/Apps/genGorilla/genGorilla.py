@@ -314,7 +314,8 @@ class Base:
                 self.f_time = float(def_input.line_set(i)[1])
             else:
                 raise InputError('In %(line)s, 2 fields needed' % {'line': def_input.line_set(i).str})
-        # Find curves
+        # Find curves, searching an index of the lines
+        def_input.index_lines()
         i = 0
         while True:
             i = def_input.find_string("$INPUT", i)
@@ -789,22 +790,10 @@ def load_data(base_profile_data, base_profile_int_data, rand_profile_data):
     # Load
     if base_profile_data.load() == 0 or base_profile_int_data.load() == 0 or rand_profile_data.load() == 0:
         raise InputError('Trouble loading')
-    # Change case to all caps in arrays
-    base_profile_data.upcase()
-    base_profile_int_data.upcase()
-    rand_profile_data.upcase()
-    # Strip comment lines from arrays
-    base_profile_data.strip_comments("#")
-    base_profile_int_data.strip_comments("#")
-    rand_profile_data.strip_comments("#")
-    # Strip blank lines from arrays
-    base_profile_data.strip_blank_lines()
-    base_profile_int_data.strip_blank_lines()
-    rand_profile_data.strip_blank_lines()
-    # Tokenize, creating separate internal token array.
-    base_profile_data.tokenize(" \t\n\r,")
-    base_profile_int_data.tokenize(" \t\n\r,")
-    rand_profile_data.tokenize(" \t\n\r,")
+    # Strip comments, change case to all caps and strip blank lines in one pass, then
+    # tokenize, creating separate internal token array as lines are looked at
+    for data in (base_profile_data, base_profile_int_data, rand_profile_data):
+        data.preprocess(comments=["#"], strip_blank=True, case='upper', delimiters=" \t\n\r,", lazy=True)
     return
 
 
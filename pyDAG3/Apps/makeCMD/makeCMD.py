@@ -363,12 +363,8 @@ def list_shm(shm_file):
     """Recursively list shm file and extract lists"""
     shm_in_file = InFile(shm_file)
     shm_in_file.load()
-    shm_in_file.gsub('#include', 'INCLUDE')
-    shm_in_file.strip_comments('#')
-    shm_in_file.strip_comments('%')
-    shm_in_file.strip_comments('!')
-    shm_in_file.strip_blank_lines()
-    shm_in_file.tokenize('. \r\n')
+    shm_in_file.preprocess(substitutions={'#include': 'INCLUDE'}, comments=['#', '%', '!'], strip_blank=True,
+                           delimiters='. \r\n')
     raw_list = []
     full_list = []
     shm_list = []
@@ -0,0 +1,101 @@
+# Vectorized frequency response of the servo_loop structure
+"""Open loop frequency response and stability margins of the servo_loop
+structure, control law gain*(tau*s + 1)/(pole*s + 1), integrator 1/s, actuator
+lag 1/(act*s + 1) and sensor lag 1/(sens*s + 1), evaluated directly with NumPy.
+Design parameters broadcast against each other, so arrays of designs are
+evaluated at once without building python-control objects.
+
+>>> gm, pm, wg, wp = servo_margins(10, 0.1)
+>>> [round(float(x), 4) for x in (gm, pm, wg, wp)]
+[22.5, 79.7973, 111.8034, 9.92]
+>>> gm, pm, wg, wp = servo_margins([1, 100], [0.1, 0.05])
+>>> gm.round(4), pm.round(4)
+(array([225.    ,   3.6701]), array([88.9688, 34.1392]))
+>>> wg.round(4), wp.round(4)
+(array([111.8034, 101.4539]), array([ 0.9999, 45.5894]))
+>>> abs(loop_response(9.92, 10, 0.1)).round(4)
+np.float64(1.0)
+"""
+import numpy as np
+
+ACTUATOR_LAG = 0.1  # actuator lag time constant, s
+SENSOR_LAG = 0.01  # sensor lag time constant, s
+CONTROL_POLE = 0.008  # control law lead-lag pole time constant, s
+W_DEFAULT = np.logspace(-4, 6, 501)  # default search frequencies, r/s
+
+
+def loop_response(w, gain, tau, act=ACTUATOR_LAG, sens=SENSOR_LAG, pole=CONTROL_POLE):
+    """Open loop complex response at frequencies w (last axis) for broadcast designs"""
+    s = 1j * np.asarray(w, dtype=float)
+    gain, tau, act, sens, pole = [np.asarray(p, dtype=float)[..., np.newaxis] if np.ndim(w) else p
+                                  for p in (gain, tau, act, sens, pole)]
+    num = np.polyval([tau, 1.], s) * gain
+    den = s * np.polyval([act, 1.], s) * np.polyval([sens, 1.], s) * np.polyval([pole, 1.], s)
+    return num / den
+
+
+def _log_mag(lw, gain, tau, act, sens, pole):
+    """Natural log of loop gain at log10 frequency lw"""
+    w = 10. ** lw
+    w2 = w * w
+    return np.log(np.abs(gain) / w) + 0.5 * (np.log1p(tau * tau * w2) - np.log1p(act * act * w2)
+                                             - np.log1p(sens * sens * w2) - np.log1p(pole * pole * w2))
+
+
+def _phase_180(lw, gain, tau, act, sens, pole):
+    """Unwrapped loop phase plus pi at log10 frequency lw, radians"""
+    w = 10. ** lw
+    return np.pi / 2 + np.arctan(tau * w) - np.arctan(act * w) - np.arctan(sens * w) - np.arctan(pole * w)
+
+
+def _crossings(func, params, lw, iterations):
+    """Design index and log10 frequency of every zero crossing of func, found on
+    grid lw then refined by vectorized bisection"""
+    values = func(lw, *[p[:, np.newaxis] for p in params])
+    sign = np.signbit(values)
+    design, k = np.nonzero(sign[:, :-1] != sign[:, 1:])
+    p = [x[design] for x in params]
+    lo = lw[k]
+    hi = lw[k + 1]
+    sign_lo = sign[design, k]
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        right = np.signbit(func(mid, *p)) == sign_lo
+        lo = np.where(right, mid, lo)
+        hi = np.where(right, hi, mid)
+    return design, (lo + hi) / 2, p
+
+
+def _select_min(n, design, key, w):
+    """Per design, the smallest key and its frequency; inf and nan if none"""
+    best = np.full(n, np.inf)
+    np.minimum.at(best, design, key)
+    w_best = np.full(n, np.nan)
+    chosen = key == best[design]
+    w_best[design[chosen]] = w[chosen]
+    return best, w_best
+
+
+def servo_margins(gain, tau, act=ACTUATOR_LAG, sens=SENSOR_LAG, pole=CONTROL_POLE, w=None, iterations=50):
+    """Gain margin (absolute), phase margin (deg), phase and gain crossover
+    frequencies (r/s), like control.margin, with the broadcast shape of the designs.
+    w is the grid of frequencies searched for crossovers"""
+    shape = np.broadcast(gain, tau, act, sens, pole).shape
+    params = [np.broadcast_to(np.asarray(p, dtype=float), shape).ravel() for p in (gain, tau, act, sens, pole)]
+    n = params[0].size
+    lw = np.log10(W_DEFAULT if w is None else np.asarray(w, dtype=float))
+
+    design, lwg, p = _crossings(_phase_180, params, lw, iterations)
+    gm, wg = _select_min(n, design, np.exp(-_log_mag(lwg, *p)), 10. ** lwg)
+    design, lwp, p = _crossings(_log_mag, params, lw, iterations)
+    pm_all = np.degrees(_phase_180(lwp, *p))
+    pm_abs, wp = _select_min(n, design, np.abs(pm_all), 10. ** lwp)
+    pm = np.full(n, np.inf)
+    chosen = np.abs(pm_all) == pm_abs[design]
+    pm[design[chosen]] = pm_all[chosen]
+    return tuple(x.reshape(shape) for x in (gm, pm, wg, wp))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
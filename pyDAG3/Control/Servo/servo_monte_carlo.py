@@ -0,0 +1,95 @@
+# Robustness Monte Carlo of servo_loop margins
+"""Distribution of servo_loop gain and phase margins for one (gain, tau) design
+when the actuator lag, sensor lag and control law pole constants are perturbed.
+Samples are drawn in the calling process, then evaluated by the vectorized
+servo_freq margins in chunks, optionally across a process pool.
+
+>>> results = margin_monte_carlo(10, 0.1, n=10000, act=Normal(0.1, 0.01), sens=Uniform(0.008, 0.012),
+...                              seed=1)
+>>> sorted(results)
+['act', 'gm', 'pm', 'pole', 'sens', 'wg', 'wp']
+>>> results['gm'].shape, bool(np.all(results['pole'] == 0.008))
+((10000,), True)
+>>> stats = summarize(results)
+>>> round(stats['gm']['p50'], 1), round(stats['pm']['p50'], 1)
+(22.6, 79.8)
+>>> stats['pm']['min'] < stats['pm']['p50'] < stats['pm']['max']
+True
+>>> pooled = margin_monte_carlo(10, 0.1, n=10000, act=Normal(0.1, 0.01), sens=Uniform(0.008, 0.012),
+...                             seed=1, chunk=2500, processes=2)
+>>> bool(np.array_equal(pooled['pm'], results['pm']))
+True
+"""
+import numpy as np
+from pyDAG3.Control.Servo.servo_freq import ACTUATOR_LAG, SENSOR_LAG, CONTROL_POLE
+from pyDAG3.Control.Servo.servo_sweep import margins_batched
+
+
+class Normal:
+    """Normally distributed constant"""
+
+    def __init__(self, mean, sd):
+        self.mean = mean
+        self.sd = sd
+
+    def sample(self, rng, n):
+        return rng.normal(self.mean, self.sd, n)
+
+
+class Uniform:
+    """Uniformly distributed constant"""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+
+class LogNormal:
+    """Constant with normally distributed logarithm, e.g. to keep time constants positive"""
+
+    def __init__(self, median, sigma):
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self, rng, n):
+        return self.median * np.exp(rng.normal(0., self.sigma, n))
+
+
+def _draw(dist, rng, n):
+    """n samples of a distribution, or a constant repeated"""
+    if hasattr(dist, 'sample'):
+        return np.asarray(dist.sample(rng, n), dtype=float)
+    return np.full(n, float(dist))
+
+
+def margin_monte_carlo(gain, tau, n=100000, act=ACTUATOR_LAG, sens=SENSOR_LAG, pole=CONTROL_POLE, seed=None,
+                       chunk=5000, processes=1):
+    """Dictionary of n sampled constants (act, sens, pole) and their margins
+    (gm, pm, wg, wp).  Each constant is a number or a distribution with
+    sample(rng, n), e.g. Normal, Uniform or LogNormal"""
+    rng = np.random.default_rng(seed)
+    results = {'act': _draw(act, rng, n), 'sens': _draw(sens, rng, n), 'pole': _draw(pole, rng, n)}
+    gm, pm, wg, wp = margins_batched(gain, tau, results['act'], results['sens'], results['pole'], chunk=chunk,
+                                     processes=processes)
+    results.update({'gm': gm, 'pm': pm, 'wg': wg, 'wp': wp})
+    return results
+
+
+def summarize(results, percentiles=(1, 5, 50, 95, 99)):
+    """Per margin, dictionary of min, max and percentiles (keys p1, p5 ...) over
+    the finite samples"""
+    stats = {}
+    for name in ('gm', 'pm', 'wg', 'wp'):
+        x = results[name][np.isfinite(results[name])]
+        stats[name] = {'min': float(x.min()) if x.size else np.nan, 'max': float(x.max()) if x.size else np.nan}
+        for p in percentiles:
+            stats[name]['p%g' % p] = float(np.percentile(x, p)) if x.size else np.nan
+    return stats
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
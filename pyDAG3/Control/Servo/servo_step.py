@@ -0,0 +1,92 @@
+# Discrete-time closed loop step and impulse response of servo_loop designs
+"""Closed loop r to y of the servo_loop structure as a 4 state model
+(control law lead-lag, integrator, actuator lag, sensor lag), discretized once
+per design by zero-order hold and stepped as a NumPy recurrence batched across
+designs.  Time metrics are found from the sampled responses.
+
+>>> t, y = servo_step([10, 100], [0.1, 0.05], t_final=2., dt=0.0005)
+>>> y.shape
+(2, 4001)
+>>> info = step_metrics(t, y)
+>>> info['rise_time'].round(4), info['overshoot'].round(2), info['settling_time'].round(4)
+(array([0.1761, 0.0197]), array([ 0.  , 48.16]), array([0.3195, 0.201 ]))
+>>> t, y = servo_step(300, 0.01, t_final=5., dt=0.0005)
+>>> bool(np.isnan(step_metrics(t, y)['settling_time'][0]))
+True
+>>> t, y = servo_impulse(10, 0.1, t_final=2., dt=0.0005)
+>>> float(y[0, -1]) < 1e-6
+True
+"""
+import numpy as np
+from scipy.linalg import expm
+from pyDAG3.Control.Servo.servo_template import closed_loop_matrices
+
+
+def discretize(a, b, dt):
+    """Zero-order hold Ad, Bd of batched A (n, m, m), B (n, m)"""
+    n, m = b.shape
+    aug = np.zeros((n, m + 1, m + 1))
+    aug[:, :m, :m] = a * dt
+    aug[:, :m, m] = b * dt
+    phi = expm(aug)
+    return phi[:, :m, :m], phi[:, :m, m]
+
+
+def _simulate(ad, bd, c, x0, r, steps):
+    """Responses (n, steps + 1) of x[k+1] = Ad x[k] + Bd r, y = C x"""
+    x = x0
+    y = np.empty((len(x0), steps + 1))
+    y[:, 0] = x @ c
+    for k in range(steps):
+        x = np.einsum('nij,nj->ni', ad, x) + bd * r
+        y[:, k + 1] = x @ c
+    return y
+
+
+def servo_step(gain, tau, t_final=2., dt=0.001, **constants):
+    """Time vector and unit step responses (n designs, samples).
+    constants may set act, sens or pole"""
+    a, b, c = closed_loop_matrices(gain, tau, **constants)
+    ad, bd = discretize(a, b, dt)
+    steps = int(round(t_final / dt))
+    return np.arange(steps + 1) * dt, _simulate(ad, bd, c, np.zeros(b.shape), 1., steps)
+
+
+def servo_impulse(gain, tau, t_final=2., dt=0.001, **constants):
+    """Time vector and unit impulse responses (n designs, samples)"""
+    a, b, c = closed_loop_matrices(gain, tau, **constants)
+    ad, bd = discretize(a, b, dt)
+    steps = int(round(t_final / dt))
+    return np.arange(steps + 1) * dt, _simulate(ad, bd, c, b, 0., steps)
+
+
+def _first_crossing(t, y, level):
+    """Interpolated first time each row of y reaches level; nan if never"""
+    above = y >= level[:, np.newaxis]
+    k = np.argmax(above, axis=1)
+    rows = np.arange(len(y))
+    found = above[rows, k]
+    km = np.maximum(k - 1, 0)
+    y0, y1 = y[rows, km], y[rows, k]
+    frac = np.where(y1 > y0, (level - y0) / np.where(y1 > y0, y1 - y0, 1.), 0.)
+    time = np.where(k > 0, t[km] + frac * (t[k] - t[km]), t[k])
+    return np.where(found, time, np.nan)
+
+
+def step_metrics(t, y, final=1., rise=(0.1, 0.9), settle=0.02):
+    """Dictionary of rise_time (rise fraction limits), overshoot (percent) and
+    settling_time (within settle fraction of final, nan if still outside at
+    the last sample) for each row of y"""
+    final = np.broadcast_to(np.asarray(final, dtype=float), (len(y),))
+    rise_time = _first_crossing(t, y, rise[1] * final) - _first_crossing(t, y, rise[0] * final)
+    overshoot = np.maximum(y.max(axis=1) / final - 1., 0.) * 100.
+    outside = np.abs(y - final[:, np.newaxis]) > settle * np.abs(final)[:, np.newaxis]
+    last = y.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+    settling_time = np.where(outside.any(axis=1), t[np.minimum(last + 1, len(t) - 1)], t[0])
+    settling_time[outside[:, -1]] = np.nan  # not settled by the last sample
+    return {'rise_time': rise_time, 'overshoot': overshoot, 'settling_time': settling_time}
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,57 @@
+# Batched gain/tau design-space sweep of servo_loop margins
+"""Margin grids over arrays of gains and taus, computed by servo_freq in
+chunks of designs to bound memory, optionally spread across a process pool.
+
+>>> gm, pm, wg, wp = margin_grid([1, 10, 100], [0.01, 0.1])
+>>> gm.shape
+(3, 2)
+>>> gm.round(3)
+array([[135.  , 225.  ],
+       [ 13.5 ,  22.5 ],
+       [  1.35,   2.25]])
+>>> pm.round(3)
+array([[83.861, 88.969],
+       [48.273, 79.797],
+       [ 4.559, 25.075]])
+>>> gm_pool, pm_pool, wg_pool, wp_pool = margin_grid([1, 10, 100], [0.01, 0.1], chunk=2, processes=2)
+>>> bool((gm_pool == gm).all() and (pm_pool == pm).all())
+True
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from pyDAG3.Control.Servo.servo_freq import servo_margins, ACTUATOR_LAG, SENSOR_LAG, CONTROL_POLE
+
+
+def _margins_chunk(args):
+    """servo_margins of one chunk of flattened designs"""
+    return servo_margins(*args)
+
+
+def margins_batched(gain, tau, act=ACTUATOR_LAG, sens=SENSOR_LAG, pole=CONTROL_POLE, chunk=2000, processes=1):
+    """servo_margins of broadcast designs evaluated chunk designs at a time,
+    in a pool of processes (None for one per cpu) unless processes is 1"""
+    shape = np.broadcast(gain, tau, act, sens, pole).shape
+    params = [np.broadcast_to(np.asarray(p, dtype=float), shape).ravel() for p in (gain, tau, act, sens, pole)]
+    n = params[0].size
+    chunks = [tuple(p[i:i + chunk] for p in params) for i in range(0, n, chunk)]
+    if processes == 1:
+        results = [_margins_chunk(args) for args in chunks]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(_margins_chunk, chunks))
+    if not results:
+        return tuple(np.empty(shape) for _ in range(4))
+    return tuple(np.concatenate([result[i] for result in results]).reshape(shape) for i in range(4))
+
+
+def margin_grid(gains, taus, chunk=2000, processes=1, **constants):
+    """Margins (gm, pm, wg, wp), each shaped (len(gains), len(taus)), for every
+    pairing of gains and taus.  constants may set act, sens or pole"""
+    gain = np.asarray(gains, dtype=float)[:, np.newaxis]
+    tau = np.asarray(taus, dtype=float)[np.newaxis, :]
+    return margins_batched(gain, tau, chunk=chunk, processes=processes, **constants)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
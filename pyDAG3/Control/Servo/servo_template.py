@@ -0,0 +1,107 @@
+# Cached state-space assembly of the servo_loop interconnection
+"""The servo_loop block diagram (control law, integrator, actuator lag, sensor
+lag, feedback sum) reduced once to fixed state-space matrices, states
+[control lag, integrator, actuator, sensor].  Only the entries that depend on
+(gain, tau) are rewritten for a new design, instead of rebuilding and
+reconnecting transfer functions.
+
+>>> import warnings
+>>> warnings.simplefilter('ignore', FutureWarning)
+>>> from pyDAG3.Control.Servo.servo_loop import servo_loop
+>>> template = ServoLoopTemplate()
+>>> margins, sys_ol, sys_cl = template.update(10, 0.1).servo_loop()
+>>> [round(float(x), 4) for x in margins]
+[22.5, 79.7973, 111.8034, 9.92]
+>>> ref_margins, ref_ol, ref_cl = servo_loop(100, 0.05)
+>>> margins, sys_ol, sys_cl = servo_loop_cached(100, 0.05)
+>>> bool(np.allclose(margins, ref_margins))
+True
+>>> bool(np.allclose(sys_cl.dcgain(), ref_cl.dcgain()))
+True
+>>> a, b, c = closed_loop_matrices([10, 100], [0.1, 0.05])
+>>> bool(np.allclose(a[0], template.a_cl))
+True
+"""
+import control.matlab as mat
+import numpy as np
+from pyDAG3.Control.Servo.servo_freq import ACTUATOR_LAG, SENSOR_LAG, CONTROL_POLE
+
+
+def _fixed_entries(a_ol, a_cl, b, act, sens, pole):
+    """Write entries independent of (gain, tau); arrays may lead with batch axes"""
+    a_ol[..., 0, 0] = -1. / pole
+    a_ol[..., 2, 1] = 1. / act
+    a_ol[..., 2, 2] = -1. / act
+    a_ol[..., 3, 2] = 1. / sens
+    a_ol[..., 3, 3] = -1. / sens
+    a_cl[...] = a_ol
+    a_cl[..., 0, 3] = -1. / pole  # feedback of sensor into control law lag
+    b[..., 0] = 1. / pole
+
+
+def _design_entries(a_ol, a_cl, b, gain, tau, pole):
+    """Write entries depending on (gain, tau)"""
+    a_ol[..., 1, 0] = gain * (1. - tau / pole)
+    a_cl[..., 1, 0] = a_ol[..., 1, 0]
+    b[..., 1] = gain * tau / pole
+    a_cl[..., 1, 3] = -b[..., 1]  # feedback of sensor into integrator
+
+
+class ServoLoopTemplate:
+    """State-space servo_loop with structure built once and design entries updated"""
+
+    def __init__(self, act=ACTUATOR_LAG, sens=SENSOR_LAG, pole=CONTROL_POLE):
+        self.act = act  # actuator lag time constant, s
+        self.sens = sens  # sensor lag time constant, s
+        self.pole = pole  # control law lead-lag pole time constant, s
+        self.a_ol = np.zeros((4, 4))  # open loop, error to sensor output
+        self.a_cl = np.zeros((4, 4))  # closed loop, reference to actuator output
+        self.b = np.zeros((4, 1))  # error or reference input, shared
+        self.c_ol = np.array([[0., 0., 0., 1.]])
+        self.c_cl = np.array([[0., 0., 1., 0.]])
+        self.d = np.zeros((1, 1))
+        _fixed_entries(self.a_ol, self.a_cl, self.b[:, 0], act, sens, pole)
+
+    def update(self, gain, tau):
+        """Rewrite the design entries; return self"""
+        _design_entries(self.a_ol, self.a_cl, self.b[:, 0], gain, tau, self.pole)
+        return self
+
+    def ss_ol(self):
+        """Open loop control.matlab state space"""
+        return mat.ss(self.a_ol, self.b, self.c_ol, self.d)
+
+    def ss_cl(self):
+        """Closed loop control.matlab state space"""
+        return mat.ss(self.a_cl, self.b, self.c_cl, self.d)
+
+    def servo_loop(self):
+        """Same returns as servo_loop for the present design"""
+        sys_ol = self.ss_ol()
+        return mat.margin(sys_ol), sys_ol, self.ss_cl()
+
+
+_template = ServoLoopTemplate()
+
+
+def servo_loop_cached(gain, tau):
+    """Drop-in servo_loop using a module template with the default constants"""
+    return _template.update(gain, tau).servo_loop()
+
+
+def closed_loop_matrices(gain, tau, act=ACTUATOR_LAG, sens=SENSOR_LAG, pole=CONTROL_POLE):
+    """Closed loop A (n, 4, 4), B (n, 4), C (4,) for n broadcast designs"""
+    gain, tau, act, sens, pole = [np.ravel(x) for x in np.broadcast_arrays(
+        *[np.asarray(p, dtype=float) for p in (gain, tau, act, sens, pole)])]
+    n = gain.size
+    a_ol = np.zeros((n, 4, 4))
+    a_cl = np.zeros((n, 4, 4))
+    b = np.zeros((n, 4))
+    _fixed_entries(a_ol, a_cl, b, act, sens, pole)
+    _design_entries(a_ol, a_cl, b, gain, tau, pole)
+    return a_cl, b, np.array([0., 0., 1., 0.])
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
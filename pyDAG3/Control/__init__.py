@@ -1 +1,2 @@
 from pyDAG3.Control.Servo import *
+from pyDAG3.Control.nsga2 import optim_nsga2, pareto_filter
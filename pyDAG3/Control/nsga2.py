@@ -0,0 +1,162 @@
+# NSGA-II multi-objective genetic optimizer in NumPy
+"""Native NSGA-II with the interface of Scilab optim_nsga2 and pareto_filter.
+Objectives are minimized.  A population is an array (pop_size, dim) and its
+objectives an array (pop_size, n_obj).  fobj may evaluate a whole population
+at once (vectorized=True), or one individual at a time, optionally in a
+process pool.
+
+ZDT1 test problem, whose Pareto front is f2 = 1 - sqrt(f1):
+>>> pop_opt, fobj_pop_opt, pop_init, fobj_pop_init = optim_nsga2(
+...     zdt1, [0, 0], [1, 1], pop_size=100, n_gen=40, seed=1, vectorized=True)
+>>> f_pareto, pop_pareto = pareto_filter(fobj_pop_opt, pop_opt)
+>>> bool(np.all(np.abs(f_pareto[:, 1] - (1 - np.sqrt(f_pareto[:, 0]))) < 0.02))
+True
+>>> len(f_pareto) > 50
+True
+
+Same search evaluating one individual at a time in a process pool:
+>>> pooled = optim_nsga2(zdt1_one, [0, 0], [1, 1], pop_size=100, n_gen=40, seed=1, processes=2)
+>>> bool(np.allclose(pooled[1], fobj_pop_opt))
+True
+
+Non-dominated sorting:
+>>> non_dominated_rank(np.array([[1, 2], [2, 1], [2, 2], [3, 3]]))
+array([0, 0, 1, 2])
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+def zdt1(pop):
+    """ZDT1 test objectives of a population"""
+    f1 = pop[:, 0]
+    g = 1 + 9 * pop[:, 1:].sum(axis=1) / (pop.shape[1] - 1)
+    return np.column_stack((f1, g * (1 - np.sqrt(f1 / g))))
+
+
+def zdt1_one(x):
+    """ZDT1 test objectives of one individual"""
+    g = 1 + 9 * sum(x[1:]) / (len(x) - 1)
+    return x[0], g * (1 - np.sqrt(x[0] / g))
+
+
+def dominates(f):
+    """Matrix d[i, j] true where objectives row i Pareto dominates row j"""
+    le = np.all(f[:, np.newaxis, :] <= f[np.newaxis, :, :], axis=2)
+    lt = np.any(f[:, np.newaxis, :] < f[np.newaxis, :, :], axis=2)
+    return le & lt
+
+
+def non_dominated_rank(f):
+    """Front number of each row of objectives f, 0 for the Pareto front"""
+    dom = dominates(np.asarray(f, dtype=float))
+    n_dominating = dom.sum(axis=0)
+    rank = np.full(len(f), -1)
+    front = 0
+    current = np.flatnonzero(n_dominating == 0)
+    while current.size:
+        rank[current] = front
+        n_dominating -= dom[current].sum(axis=0)
+        n_dominating[current] = -1
+        current = np.flatnonzero(n_dominating == 0)
+        front += 1
+    return rank
+
+
+def crowding_distance(f, rank):
+    """Crowding distance of each row of objectives f within its front"""
+    f = np.asarray(f, dtype=float)
+    distance = np.zeros(len(f))
+    for front in np.unique(rank):
+        members = np.flatnonzero(rank == front)
+        if members.size < 3:
+            distance[members] = np.inf
+            continue
+        for m in range(f.shape[1]):
+            order = members[np.argsort(f[members, m], kind='stable')]
+            span = f[order[-1], m] - f[order[0], m]
+            distance[order[0]] = distance[order[-1]] = np.inf
+            if span > 0:
+                distance[order[1:-1]] += (f[order[2:], m] - f[order[:-2], m]) / span
+    return distance
+
+
+def pareto_filter(fobj_pop, pop):
+    """Pareto front objectives and individuals, like Scilab pareto_filter"""
+    fobj_pop = np.asarray(fobj_pop, dtype=float)
+    front = ~dominates(fobj_pop).any(axis=0)
+    return fobj_pop[front], np.asarray(pop)[front]
+
+
+def evaluate(fobj, pop, vectorized=False, pool=None):
+    """Objectives array of population pop, one individual at a time in
+    executor pool if given"""
+    if vectorized:
+        return np.asarray(fobj(pop), dtype=float)
+    if pool is None:
+        return np.array([fobj(x) for x in pop], dtype=float)
+    return np.array(list(pool.map(fobj, pop, chunksize=max(len(pop) // 32, 1))), dtype=float)
+
+
+def _tournament(rng, rank, distance, n):
+    """Indices of n binary tournament winners on (rank, -distance)"""
+    a = rng.integers(len(rank), size=n)
+    b = rng.integers(len(rank), size=n)
+    a_wins = (rank[a] < rank[b]) | ((rank[a] == rank[b]) & (distance[a] >= distance[b]))
+    return np.where(a_wins, a, b)
+
+
+def optim_nsga2(fobj, lower, upper, pop_size=100, n_gen=10, p_mut=0.1, p_cross=0.7, seed=None, vectorized=False,
+                processes=1, delta=0.1, log=False):
+    """Minimize objectives fobj over the box [lower, upper] by NSGA-II.
+    Crossover blends couples with a random mix, mutation perturbs genes by up to
+    delta of the box width, like the Scilab defaults.  Unless vectorized,
+    individuals are evaluated in a pool of processes (None for one per cpu)
+    when processes is not 1, so fobj must be picklable.
+    Return (pop_opt, fobj_pop_opt, pop_init, fobj_pop_init)"""
+    if vectorized or processes == 1:
+        return _optim_nsga2(fobj, lower, upper, pop_size, n_gen, p_mut, p_cross, seed, vectorized, None, delta, log)
+    with ProcessPoolExecutor(processes) as pool:
+        return _optim_nsga2(fobj, lower, upper, pop_size, n_gen, p_mut, p_cross, seed, vectorized, pool, delta, log)
+
+
+def _optim_nsga2(fobj, lower, upper, pop_size, n_gen, p_mut, p_cross, seed, vectorized, pool, delta, log):
+    rng = np.random.default_rng(seed)
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    dim = len(lower)
+    pop = lower + (upper - lower) * rng.random((pop_size, dim))
+    fobj_pop = evaluate(fobj, pop, vectorized, pool)
+    pop_init, fobj_pop_init = pop, fobj_pop
+    rank = non_dominated_rank(fobj_pop)
+    distance = crowding_distance(fobj_pop, rank)
+    for gen in range(n_gen):
+        # Offspring by tournament, blend crossover and mutation
+        parents = pop[_tournament(rng, rank, distance, 2 * (pop_size // 2 + pop_size % 2))]
+        p1, p2 = parents[0::2], parents[1::2]
+        mix = rng.random((len(p1), 1))
+        crossed = rng.random((len(p1), 1)) < p_cross
+        mix = np.where(crossed, mix, 1.)
+        children = np.vstack((mix * p1 + (1 - mix) * p2, (1 - mix) * p1 + mix * p2))[:pop_size]
+        mutated = rng.random(children.shape) < p_mut
+        children = children + mutated * delta * (upper - lower) * (2 * rng.random(children.shape) - 1)
+        children = np.clip(children, lower, upper)
+        fobj_children = evaluate(fobj, children, vectorized, pool)
+
+        # Elitist survival of parents and children by front then crowding
+        pop = np.vstack((pop, children))
+        fobj_pop = np.vstack((fobj_pop, fobj_children))
+        rank = non_dominated_rank(fobj_pop)
+        distance = crowding_distance(fobj_pop, rank)
+        survivors = np.lexsort((-distance, rank))[:pop_size]
+        pop, fobj_pop = pop[survivors], fobj_pop[survivors]
+        rank = rank[survivors]
+        distance = crowding_distance(fobj_pop, rank)
+        if log:
+            print('nsga2: generation', gen + 1, 'front size', int(np.sum(rank == 0)))
+    return pop, fobj_pop, pop_init, fobj_pop_init
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
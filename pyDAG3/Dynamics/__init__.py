@@ -1 +1,8 @@
 import pyDAG3.Dynamics.ode
+from pyDAG3.Dynamics.multirate import MultiRateScheduler
+from pyDAG3.Dynamics.jit import CompiledModel, compile_derivs
+from pyDAG3.Dynamics.executive import Executive
+from pyDAG3.Dynamics.loggers import StreamLogger, CsvLogger, ColumnLogger, read_columns, write_columns, \
+    columns_to_csv
+from pyDAG3.Dynamics.trim import newton
+from pyDAG3.Dynamics.linearize import linearize
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""executive.py    Fixed-step simulation executive
+
+The Executive owns the clock.  Each step, at time = count * d_time, every
+model in the order added has its inputs assigned, is integrated by ode.rk4
+and is updated; then each logger whose decimation divides count logs the
+new states, stamped with the time the step began as model rows always were.
+
+>>> import io
+>>> import numpy as np
+>>> from pyDAG3.Dynamics.loggers import CsvLogger
+>>> class Lag:
+...     def __init__(self, tau):
+...         self.tau = tau
+...         self.u = 0.
+...         self.y = [0.]
+...         self.yp = [0.]
+...         self.ylims = [(-1e6, 1e6)]
+...         self.count = 0
+...     def derivs(self, past_values):
+...         return [(self.u - past_values[0]) / self.tau]
+...     def update(self):
+...         self.yp = [x for x in self.y]
+...         self.count += 1
+>>> def step_input(model, time):
+...     model.u = 1. if time >= 0.2 else 0.
+>>> lag = Lag(0.1)
+>>> out = io.StringIO()
+>>> executive = Executive(0.05, 0.5)
+>>> executive.add_model(lag, step_input)
+>>> executive.add_logger(CsvLogger(out, ['y'], lambda: lag.y), decimation=4)
+>>> executive.run()
+0.5
+>>> executive.count, lag.count
+(11, 11)
+>>> print(out.getvalue(), end='')
+time, y
+0, 0
+0.2, 0.393229
+0.4, 0.917752
+
+Checkpoint, continue, and restart from the checkpoint:
+>>> import os
+>>> executive.final_time = 1.
+>>> executive.save_checkpoint('temp.chk')
+>>> executive.run()
+1.0
+>>> y_end = lag.y
+>>> executive.load_checkpoint('temp.chk')
+>>> executive.count, lag.count
+(11, 11)
+>>> executive.run()
+1.0
+>>> lag.y == y_end
+True
+>>> os.remove('temp.chk')
+
+A checkpoint also holds the output position of each logger with mark(), and
+restoring rewinds the logger to it.  A run that crashed after its checkpoint
+resumes in a new process through file loggers opened to append, without
+repeating or losing rows:
+>>> from pyDAG3.Dynamics.loggers import ColumnLogger, read_columns
+>>> lag = Lag(0.1)
+>>> executive = Executive(0.05, 0.45)
+>>> executive.add_model(lag, step_input)
+>>> executive.add_logger(ColumnLogger('temp.npy', ['y'], lambda: lag.y, chunk=4))
+>>> executive.run(close=False, checkpoint_every=6, checkpoint_path='temp.chk')
+0.45
+>>> len(read_columns('temp.npy')['time'])  # the crash; rows past the checkpoint are on file
+10
+>>> lag = Lag(0.1)
+>>> executive = Executive(0.05, 1.)
+>>> executive.add_model(lag, step_input)
+>>> executive.add_logger(ColumnLogger('temp.npy', ['y'], lambda: lag.y, chunk=4, append=True))
+>>> executive.load_checkpoint('temp.chk')
+>>> executive.count
+6
+>>> executive.run()
+1.0
+>>> columns = read_columns('temp.npy')
+>>> len(columns['time']), bool(np.allclose(columns['time'], np.arange(21) * 0.05))
+(21, True)
+>>> float(columns['y'][-1]) == lag.y[0] == y_end[0]
+True
+>>> os.remove('temp.chk')
+>>> os.remove('temp.npy')
+"""
+import copy
+import os
+import pickle
+from pyDAG3.Dynamics import ode
+
+
+class Executive:
+    """Fixed-step simulation clock, model sequencer and logger dispatcher"""
+
+    def __init__(self, d_time, final_time):
+        self.d_time = d_time  # update time
+        self.final_time = final_time  # last step begins at or after this time
+        self.count = 0  # number of steps taken
+        self.time = 0.  # time at start of next step
+        self.models = []  # list of (model, inputs) in call order
+        self.loggers = []  # list of (logger, decimation)
+
+    def add_model(self, model, inputs=None):
+        """Call model in order each step; inputs(model, time) assigns its inputs first"""
+        self.models.append((model, inputs))
+
+    def add_logger(self, logger, decimation=1):
+        """Log every decimation steps, starting with the first"""
+        self.loggers.append((logger, decimation))
+
+    def step(self):
+        """Advance every model one step and dispatch to due loggers"""
+        time = self.count * self.d_time
+        d_time = self.d_time
+        for model, inputs in self.models:
+            if inputs is not None:
+                inputs(model, time)
+            ode.rk4(model, d_time)
+            model.update()
+        count = self.count
+        self.count = count + 1
+        self.time = self.count * d_time
+        for logger, decimation in self.loggers:
+            if not count % decimation:
+                logger.log(time)
+        return time
+
+    def run(self, close=True, checkpoint_every=None, checkpoint_path=None):
+        """Step until a step begins at or after final_time; return its time.
+        With close the loggers are closed after, so a run continued later in the
+        same process needs close=False or new loggers.  With checkpoint_every,
+        save_checkpoint(checkpoint_path) after every that many steps"""
+        if checkpoint_every and checkpoint_path is None:
+            raise ValueError('checkpoint_every needs a checkpoint_path')
+        while True:
+            time = self.step()
+            if checkpoint_every and not self.count % checkpoint_every:
+                self.save_checkpoint(checkpoint_path)
+            if self.final_time <= time:
+                break
+        if close:
+            for logger, decimation in self.loggers:
+                logger.close()
+        return time
+
+    def snapshot(self):
+        """Independent copy of clock and model states; models provide snapshot()
+        or else their y, yp and count are saved.  Loggers providing mark() are
+        flushed and their output positions saved; others (None) are not.  To
+        resume in a new process, add loggers that append, e.g.
+        ColumnLogger(..., append=True), before restoring"""
+        models = []
+        for model, inputs in self.models:
+            if hasattr(model, 'snapshot'):
+                models.append(model.snapshot())
+            else:
+                models.append({'y': model.y, 'yp': model.yp, 'count': getattr(model, 'count', 0)})
+        marks = [logger.mark() if hasattr(logger, 'mark') else None for logger, decimation in self.loggers]
+        return copy.deepcopy({'count': self.count, 'time': self.time, 'models': models, 'loggers': marks})
+
+    def restore(self, snap):
+        """Return clock and models to snapshot snap, e.g. to fork runs from a
+        shared initial condition, and rewind loggers with saved marks to them"""
+        if len(snap['models']) != len(self.models):
+            raise ValueError('snapshot has %d models, executive has %d' % (len(snap['models']), len(self.models)))
+        if len(snap['loggers']) != len(self.loggers):
+            raise ValueError('snapshot has %d loggers, executive has %d' % (len(snap['loggers']), len(self.loggers)))
+        snap = copy.deepcopy(snap)
+        self.count = snap['count']
+        self.time = snap['time']
+        for (model, inputs), model_snap in zip(self.models, snap['models']):
+            if hasattr(model, 'restore'):
+                model.restore(model_snap)
+            else:
+                model.y = model_snap['y']
+                model.yp = model_snap['yp']
+                model.count = model_snap['count']
+        for (logger, decimation), mark in zip(self.loggers, snap['loggers']):
+            if mark is not None:
+                logger.rewind(mark)
+
+    def save_checkpoint(self, path):
+        """Write snapshot to file path, replacing it only once complete"""
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(self.snapshot(), f)
+        os.replace(path + '.tmp', path)
+
+    def load_checkpoint(self, path):
+        """Restore snapshot from file path"""
+        with open(path, 'rb') as f:
+            self.restore(pickle.load(f))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""jit.py    Optionally compiled derivative functions for ode.rk4
+
+A derivative function written as func(p, x), pure arithmetic on a parameter
+array p and a state array x returning a tuple of derivatives, is compiled
+with Numba when it is installed and used as plain Python otherwise.
+CompiledModel wraps it so ode.rk4 integrates it like any other model; when
+compiled, the whole RK4 step runs in one compiled kernel (see rk4_kernel).
+
+>>> import numpy as np
+>>> from pyDAG3.Dynamics import ode
+
+>>> def spring(p, x):
+...     return x[1], (-p[0] * x[0] - p[1] * x[1]) / p[2]
+
+>>> class Spring:
+...     def __init__(self):
+...         self.k, self.c, self.m = 4., 0.5, 2.
+...         self.y = [1., 0.]
+...         self.yp = [1., 0.]
+...         self.ylims = [(-1e6, 1e6), (-1e6, 1e6)]
+...     def derivs(self, past_values):
+...         x, v = past_values
+...         return v, (-self.k * x - self.c * v) / self.m
+
+Parity of compiled and attribute-lookup models:
+>>> ref = Spring()
+>>> fast = CompiledModel(spring, [ref.k, ref.c, ref.m], ref.y, ref.ylims)
+>>> for i in range(100):
+...     ode.rk4(ref, 0.01)
+...     ref.yp = [x for x in ref.y]
+...     ode.rk4(fast, 0.01)
+...     fast.yp = [x for x in fast.y]
+>>> [float(x) for x in fast.y] == ref.y
+True
+
+Uncompiled, the function runs on plain lists and floats:
+>>> slow = CompiledModel(spring, [ref.k, ref.c, ref.m], [1., 0.], ref.ylims, compiled=False)
+>>> slow.compiled, type(slow.p)
+(False, <class 'list'>)
+>>> ode.rk4(slow, 0.01)
+>>> type(slow.y[0])
+<class 'float'>
+"""
+import functools
+import numpy as np
+
+
+@functools.lru_cache(maxsize=None)
+def compile_derivs(func):
+    """Compile func(p, x) with Numba if available, else return func unchanged.
+    Numba is imported here rather than with the package, as it is slow to load.
+    Each func is compiled once, however many models share it"""
+    try:
+        from numba import njit
+    except ImportError:
+        return func
+    return njit(func)
+
+
+_kernels = {}  # rk4_kernel of each compiled derivative function
+
+
+def rk4_kernel(derivs):
+    """Compiled kernel(p, yp, dt, lo, hi) returning the state array after one
+    ode.rk4 step of compiled derivs(p, x) from past values yp, limited to
+    [lo, hi].  Arithmetic is in the order of ode.rk4, so results match it"""
+    kernel = _kernels.get(derivs)
+    if kernel is None:
+        from numba import njit
+
+        @njit
+        def kernel(p, yp, dt, lo, hi):
+            half = dt / 2
+            k1 = np.array(derivs(p, yp))
+            k2 = np.array(derivs(p, yp + k1 * half))
+            k3 = np.array(derivs(p, yp + k2 * half))
+            k4 = np.array(derivs(p, yp + k3 * dt))
+            rate = (k1 + 2 * k2 + 2 * k3 + k4) / 6
+            return np.maximum(np.minimum(yp + rate * dt, hi), lo)
+        _kernels[derivs] = kernel
+    return kernel
+
+
+class CompiledModel:
+    """Adapter presenting a compiled func(p, x) to ode.rk4
+    Item                            Description
+    func                            Derivative function of parameter array p and
+                                    state array x
+    p                               Parameter array, update in place for inputs;
+                                    a list of floats when not compiled
+    y, yp, ylims                    As for ode.rk4; ylims are read once, when
+                                    compiled
+    step(dt)                        Compiled RK4 step, called by ode.rk4
+    """
+
+    def __init__(self, func, p, y, ylims, compiled=True):
+        self.func = compile_derivs(func) if compiled else func
+        self.compiled = self.func is not func
+        if self.compiled:
+            self.p = np.array(p, dtype=float)
+            self.kernel = rk4_kernel(self.func)
+            self.lo = np.array([lim[0] for lim in ylims], dtype=float)
+            self.hi = np.array([lim[1] for lim in ylims], dtype=float)
+        else:
+            self.p = [float(x) for x in p]  # plain Python indexes lists faster than arrays
+        self.y = [x for x in y]
+        self.yp = [x for x in y]
+        self.ylims = ylims
+
+    def derivs(self, past_values):
+        """Derivatives of the compiled function at past_values"""
+        if self.compiled:
+            return self.func(self.p, np.asarray(past_values, dtype=float))
+        return self.func(self.p, past_values)
+
+    def step(self, dt):
+        """Update y by one RK4 step from yp in the compiled kernel"""
+        self.y = self.kernel(self.p, np.asarray(self.yp, dtype=float), dt, self.lo, self.hi).tolist()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
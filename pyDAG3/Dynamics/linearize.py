@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""linearize.py    State-space linear models of nonlinear derivative functions
+
+Central differences give A, B, C, D of
+    xdot = f(x, u) ~ A dx + B du
+    y    = g(x, u) ~ C dx + D du
+about an operating point, ready for control.ss(A, B, C, D).
+Complex-step differencing is not used because model code such as table
+lookups and max() limits does not accept complex arguments.
+
+>>> def pendulum(x, u):
+...     return [x[1], -4. * x[0] - 0.5 * x[1] + 2. * u[0]]
+>>> a, b, c, d = linearize(pendulum, [0., 0.], [0.])
+>>> a.round(6)
+array([[ 0. ,  1. ],
+       [-4. , -0.5]])
+>>> b.round(6)
+array([[0.],
+       [2.]])
+>>> c
+array([[1., 0.],
+       [0., 1.]])
+>>> d
+array([[0.],
+       [0.]])
+"""
+import numpy as np
+
+
+def _jacobians(func, x0, u0, rel_step):
+    x0 = np.array(x0, dtype=float)
+    u0 = np.array(u0, dtype=float)
+    n = len(x0)
+    z0 = np.concatenate((x0, u0))
+    columns = []
+    for j in range(len(z0)):
+        h = rel_step * max(abs(z0[j]), 1.)
+        zp = z0.copy()
+        zm = z0.copy()
+        zp[j] += h
+        zm[j] -= h
+        fp = np.asarray(func(list(zp[:n]), list(zp[n:])), dtype=float)
+        fm = np.asarray(func(list(zm[:n]), list(zm[n:])), dtype=float)
+        columns.append((fp - fm) / (2 * h))
+    jac = np.column_stack(columns)
+    return jac[:, :n], jac[:, n:]
+
+
+def linearize(f, x0, u0, g=None, rel_step=1e-6):
+    """Return A, B, C, D of f and output function g (default y = x) at (x0, u0)"""
+    a, b = _jacobians(f, x0, u0, rel_step)
+    if g is None:
+        c = np.eye(len(x0))
+        d = np.zeros((len(x0), len(u0)))
+    else:
+        c, d = _jacobians(g, x0, u0, rel_step)
+    return a, b, c, d
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""loggers.py    Simulation output loggers for the Executive
+
+A logger has log(time), called only on the samples it is to record, and
+close(), called when the run ends to flush output.  The caller owns the
+stream.  Formatting happens inside log so
+decimated samples cost nothing.  A logger that can resume after a checkpoint
+also has mark(), flushing and returning its output position, and
+rewind(mark), discarding output logged after it.
+
+>>> import io
+>>> class Source:
+...     x = 1.5
+...     y = 2
+>>> src = Source()
+>>> out = io.StringIO()
+>>> csv = CsvLogger(out, ['x', 'y'], lambda: (src.x, src.y))
+>>> csv.log(0.)
+>>> src.x = 3.25
+>>> csv.log(0.1)
+>>> print(out.getvalue(), end='')
+time, x, y
+0, 1.5, 2
+0.1, 3.25, 2
+>>> out = io.StringIO()
+>>> stream = StreamLogger(out, lambda: 'x=%g\\n' % src.x)
+>>> stream.log(0.)
+>>> out.getvalue()
+'x=3.25\\n'
+
+Columnar logging, in memory and to file:
+>>> import os
+>>> col = ColumnLogger(None, ['x', 'y'], lambda: (src.x, src.y), chunk=2)
+>>> for i in range(5):
+...     src.x = i * 0.5
+...     col.log(i * 0.1)
+>>> col.close()
+>>> col.columns()['x']
+array([0. , 0.5, 1. , 1.5, 2. ])
+>>> col = ColumnLogger('temp.npy', ['x', 'y'], lambda: (src.x, src.y), chunk=2)
+>>> for i in range(3):
+...     src.x = i * 0.5
+...     col.log(i * 0.1)
+>>> col.close()
+>>> columns = read_columns('temp.npy')
+>>> list(columns)
+['time', 'x', 'y']
+>>> columns['x']
+array([0. , 0.5, 1. ])
+>>> out = io.StringIO()
+>>> columns_to_csv(columns, out)
+>>> print(out.getvalue(), end='')
+time, x, y
+0, 0, 2
+0.1, 0.5, 2
+0.2, 1, 2
+
+Logging after close is an error; a later run appends through a new logger:
+>>> col.log(0.3)
+Traceback (most recent call last):
+ValueError: log to closed ColumnLogger
+>>> col = ColumnLogger('temp.npy', ['x', 'y'], lambda: (src.x, src.y), append=True)
+>>> col.log(0.3)
+>>> col.close()
+>>> read_columns('temp.npy')['time']
+array([0. , 0.1, 0.2, 0.3])
+
+Rewinding to a mark drops the samples logged after it:
+>>> col = ColumnLogger('temp.npy', ['x', 'y'], lambda: (src.x, src.y), chunk=2, append=True)
+>>> mark = col.mark()
+>>> for i in range(4, 7):
+...     col.log(i * 0.1)
+>>> col.rewind(mark)
+>>> col.log(0.4)
+>>> col.close()
+>>> read_columns('temp.npy')['time']
+array([0. , 0.1, 0.2, 0.3, 0.4])
+>>> write_columns('temp.npy', columns)
+>>> read_columns('temp.npy')['time']
+array([0. , 0.1, 0.2])
+>>> os.remove('temp.npy')
+"""
+import os
+import numpy as np
+
+
+class StreamLogger:
+    """Write the string returned by text() to stream each sample"""
+
+    def __init__(self, stream, text):
+        self.stream = stream  # open file-like object
+        self.text = text  # function returning the string to write
+
+    def log(self, time):
+        self.stream.write(self.text())
+
+    def close(self):
+        self.stream.flush()
+
+
+class CsvLogger:
+    """Write time and values() as comma separated lines under a header of names"""
+
+    def __init__(self, stream, names, values):
+        self.stream = stream  # open file-like object
+        self.names = names  # list of column names after time
+        self.values = values  # function returning sequence of values
+        self.header = 'time, ' + ', '.join(names) + '\n'
+        self.fmt = ', '.join(['%g'] * (len(names) + 1)) + '\n'
+
+    def log(self, time):
+        if self.header:
+            self.stream.write(self.header)
+            self.header = None
+        self.stream.write(self.fmt % ((time,) + tuple(self.values())))
+
+    def close(self):
+        self.stream.flush()
+
+
+class ColumnLogger:
+    """Copy time and values() into preallocated NumPy column buffers, flushed
+    every chunk samples as one (columns x samples) block appended to path.
+    The file is a sequence of .npy arrays: the column names, then the blocks.
+    With path None the blocks are kept in memory.  With append, samples are
+    added to the end of an existing file of the same names, e.g. to resume a
+    run from a checkpoint; otherwise path is overwritten."""
+
+    def __init__(self, path, names, values, chunk=4096, append=False):
+        self.path = path  # output file name, or None
+        self.names = ['time'] + list(names)  # column names
+        self.values = values  # function returning sequence of values
+        self.buf = np.empty((len(self.names), chunk))  # column buffers
+        self.n = 0  # samples in buffers
+        self.blocks = []  # flushed blocks when path is None
+        self.f = None
+        self.closed = False
+        self.end = None  # mark when closed
+        if path is not None:
+            if append and os.path.isfile(path) and os.path.getsize(path):
+                with open(path, 'rb') as f:
+                    file_names = [str(name) for name in np.load(f)]
+                if file_names != self.names:
+                    raise ValueError('%s has columns %s, not %s' % (path, file_names, self.names))
+                self.f = open(path, 'ab')
+            else:
+                self.f = open(path, 'wb')
+                np.save(self.f, np.array(self.names))
+
+    def log(self, time):
+        if self.closed:
+            raise ValueError('log to closed ColumnLogger')
+        n = self.n
+        buf = self.buf
+        buf[0, n] = time
+        buf[1:, n] = self.values()
+        n += 1
+        self.n = n
+        if n == buf.shape[1]:
+            self.flush()
+
+    def flush(self):
+        """Write buffered samples"""
+        if not self.n:
+            return
+        block = self.buf[:, :self.n]
+        if self.f is not None:
+            np.save(self.f, block)
+        else:
+            self.blocks.append(block.copy())
+        self.n = 0
+
+    def mark(self):
+        """Flush; return the file offset, or the number of samples in memory"""
+        if self.closed:
+            return self.end
+        self.flush()
+        if self.f is not None:
+            self.f.flush()
+            return self.f.tell()
+        return sum(block.shape[1] for block in self.blocks)
+
+    def rewind(self, mark):
+        """Discard samples logged after mark"""
+        if self.closed:
+            raise ValueError('rewind of closed ColumnLogger')
+        self.n = 0
+        if self.f is not None:
+            self.f.flush()
+            self.f.seek(mark)
+            self.f.truncate()
+        elif self.blocks:
+            self.blocks = [np.concatenate(self.blocks, axis=1)[:, :mark]]
+
+    def close(self):
+        self.end = self.mark()
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+        self.closed = True
+
+    def columns(self):
+        """Dictionary of column name to array of the samples logged in memory"""
+        self.flush()
+        return _join_blocks(self.names, self.blocks)
+
+
+def _join_blocks(names, blocks):
+    if blocks:
+        data = np.concatenate(blocks, axis=1)
+    else:
+        data = np.empty((len(names), 0))
+    return dict(zip(names, data))
+
+
+def read_columns(path):
+    """Dictionary of column name to array of samples from a ColumnLogger file"""
+    blocks = []
+    with open(path, 'rb') as f:
+        names = [str(name) for name in np.load(f)]
+        while f.peek(1):
+            blocks.append(np.load(f))
+    return _join_blocks(names, blocks)
+
+
+def write_columns(path, columns):
+    """Write dictionary of equal length columns to path in the ColumnLogger file format"""
+    with open(path, 'wb') as f:
+        np.save(f, np.array(list(columns)))
+        if columns:
+            np.save(f, np.vstack(list(columns.values())))
+
+
+def columns_to_csv(columns, stream):
+    """Write dictionary of columns as comma separated lines under a header of names"""
+    stream.write(', '.join(columns) + '\n')
+    if columns:
+        np.savetxt(stream, np.column_stack(list(columns.values())), fmt='%g', delimiter=', ')
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""multirate.py    Multi-rate integration of coupled subsystems
+
+Each subsystem is an object integrable by ode.rk4 (y, yp, ylims, derivs)
+registered with its own step size.  Step sizes must be integer multiples of
+the fastest one.  Slower subsystems step first at shared frame times; faster
+subsystems then see the slow states linearly interpolated across the slow
+step, and slow subsystems see the fast states at their own step time.
+
+>>> class Lag:
+...     def __init__(self, tau, y0=0.):
+...         self.tau = tau
+...         self.u = 0.
+...         self.y = [y0]
+...         self.yp = [y0]
+...         self.ylims = [(-1e6, 1e6)]
+...     def derivs(self, past_values):
+...         return [(self.u - past_values[0]) / self.tau]
+
+>>> fast = Lag(0.01)
+>>> slow = Lag(1., 1.)
+>>> def drive_fast(obj, time, sched):
+...     obj.u = sched.state('slow', time)[0]
+>>> sched = MultiRateScheduler()
+>>> sched.add('slow', slow, 0.1)
+>>> sched.add('fast', fast, 0.001, drive_fast)
+>>> sched.base_dt
+0.001
+>>> sched.run(1.)
+>>> round(sched.time, 6), slow.count, fast.count
+(1.0, 10, 1000)
+>>> round(fast.y[0], 3), round(slow.y[0], 3)
+(0.372, 0.368)
+"""
+from pyDAG3.Dynamics import ode
+
+
+class Subsystem:
+    """Bookkeeping for one subsystem of a MultiRateScheduler"""
+
+    def __init__(self, name, obj, dt, ratio, couple=None):
+        self.name = name  # key used by MultiRateScheduler.state
+        self.obj = obj  # object integrated by ode.rk4
+        self.dt = dt  # step size
+        self.ratio = ratio  # step size in base steps
+        self.couple = couple  # couple(obj, time, scheduler) assigns inputs before each step
+        self.t0 = 0.  # time of past value
+        self.y0 = list(obj.yp)  # past value
+        self.t1 = 0.  # time of present value
+        self.y1 = list(obj.yp)  # present value
+        obj.count = getattr(obj, 'count', 0)
+
+
+class MultiRateScheduler:
+    """Integrate registered subsystems each at its own step size"""
+
+    def __init__(self):
+        self.subsystems = []  # list of Subsystem, slowest first
+        self.names = {}  # name to Subsystem
+        self.base_dt = None  # fastest step size
+        self.count = 0  # number of base steps taken
+        self.time = 0.  # scheduler time
+
+    def add(self, name, obj, dt, couple=None):
+        """Register obj integrated every dt with optional input coupling
+        function couple(obj, time, scheduler) called before each of its steps"""
+        if name in self.names:
+            raise ValueError('subsystem %s already added' % name)
+        if self.count:
+            raise ValueError('cannot add subsystems after running')
+        self.base_dt = dt if self.base_dt is None else min(self.base_dt, dt)
+        sub = Subsystem(name, obj, dt, 1, couple)
+        self.subsystems.append(sub)
+        self.names[name] = sub
+        for sub in self.subsystems:
+            ratio = round(sub.dt / self.base_dt)
+            if abs(ratio * self.base_dt - sub.dt) > 1e-9 * sub.dt:
+                raise ValueError('step of %s is not a multiple of %g' % (sub.name, self.base_dt))
+            sub.ratio = ratio
+        self.subsystems.sort(key=lambda s: -s.dt)
+
+    def state(self, name, time):
+        """State of subsystem name linearly interpolated to time, held
+        outside its last step"""
+        sub = self.names[name]
+        if time >= sub.t1 or sub.t1 == sub.t0:
+            return sub.y1
+        if time <= sub.t0:
+            return sub.y0
+        frac = (time - sub.t0) / (sub.t1 - sub.t0)
+        return [a + (b - a) * frac for a, b in zip(sub.y0, sub.y1)]
+
+    def step(self):
+        """Advance one base step, stepping every subsystem that is due"""
+        time = self.count * self.base_dt
+        for sub in self.subsystems:
+            if self.count % sub.ratio:
+                continue
+            obj = sub.obj
+            if sub.couple is not None:
+                sub.couple(obj, time, self)
+            ode.rk4(obj, sub.dt)
+            if hasattr(obj, 'update'):
+                obj.update()
+            else:
+                obj.yp = [x for x in obj.y]
+                obj.count += 1
+            sub.t0, sub.y0 = time, sub.y1
+            sub.t1, sub.y1 = time + sub.dt, list(obj.y)
+        self.count += 1
+        self.time = self.count * self.base_dt
+
+    def run(self, final_time):
+        """Step until time reaches final_time"""
+        while self.time < final_time - self.base_dt / 2:
+            self.step()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
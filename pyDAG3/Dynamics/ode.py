@@ -30,7 +30,17 @@ def rk4(obj, dt):
                                     calculations
     return value                    None; rk4 updates the objects state list y
 
+    A compiled object, obj.compiled true, integrates itself by obj.step(dt),
+    e.g. jit.CompiledModel.
     """
+    if getattr(obj, 'compiled', False):
+        obj.step(dt)
+        return
+    rk4_step(obj, dt)
+
+
+def rk4_step(obj, dt):
+    """rk4 returning k1, the derivatives at the past values"""
     i_range = range(len(obj.y))
     k1 = obj.derivs(obj.yp)
     k2 = obj.derivs(euler(obj.yp, k1, i_range, dt / 2))
@@ -38,3 +48,101 @@ def rk4(obj, dt):
     k4 = obj.derivs(euler(obj.yp, k3, i_range, dt))
     rk4_rate = [(k1[i] + 2 * k2[i] + 2 * k3[i] + k4[i]) / 6 for i in i_range]
     obj.y = euler(obj.yp, rk4_rate, i_range, dt, obj.ylims)
+    return k1
+
+
+def hermite(y0, f0, y1, f1, theta, dt):
+    """Cubic Hermite interpolation of state between past value y0 (rate f0)
+    and new value y1 (rate f1) at fraction theta of the step dt"""
+    t2 = theta * theta
+    t3 = t2 * theta
+    h00 = 2 * t3 - 3 * t2 + 1
+    h10 = (t3 - 2 * t2 + theta) * dt
+    h01 = -2 * t3 + 3 * t2
+    h11 = (t3 - t2) * dt
+    return [h00 * y0[i] + h10 * f0[i] + h01 * y1[i] + h11 * f1[i]
+            for i in range(len(y0))]
+
+
+def rk4_events(obj, dt, events, tol=1e-9, max_iter=50):
+    """Explicit RK4 integration on an object with event location.
+    Same as rk4, then each event function is checked for a sign change
+    across the step and the crossing is located inside the step by
+    Illinois false position on a cubic Hermite interpolant of the state.
+    Item                            Description
+    obj                             Object as for rk4
+    dt                              Update time
+    events                          List of functions of state, g = event(y);
+                                    an event occurs where g crosses zero.
+                                    Optional attribute event.direction
+                                    selects rising (> 0), falling (< 0) or
+                                    either (0, default) crossings
+    tol                             Time tolerance of located crossing
+    max_iter                        Root finding iteration limit
+    return value                    List of (index into events, time into
+                                    step, interpolated state) tuples sorted
+                                    by time; empty if no event occurred.
+                                    rk4_events updates the objects state
+                                    list y just as rk4 does
+
+    >>> class Decay:
+    ...     def __init__(self):
+    ...         self.y = [1.]
+    ...         self.yp = [1.]
+    ...         self.ylims = [(-1e6, 1e6)]
+    ...     def derivs(self, past_values):
+    ...         return [-past_values[0]]
+    >>> def half(y):
+    ...     return y[0] - 0.5
+    >>> half.direction = -1
+    >>> decay = Decay()
+    >>> rk4_events(decay, 0.5, [half])
+    []
+    >>> decay.yp = decay.y
+    >>> found = rk4_events(decay, 0.5, [half])
+    >>> index, t_event, y_event = found[0]
+    >>> index, round(0.5 + t_event, 2), round(y_event[0], 6)
+    (0, 0.69, 0.5)
+    """
+    g0 = [event(obj.yp) for event in events]
+    f0 = rk4_step(obj, dt)
+    g1 = [event(obj.y) for event in events]
+    found = []
+    f1 = None
+    for k in range(len(events)):
+        if g0[k] * g1[k] > 0 or g0[k] == g1[k]:
+            continue
+        direction = getattr(events[k], 'direction', 0)
+        if direction > 0 and g1[k] < g0[k] or direction < 0 and g1[k] > g0[k]:
+            continue
+        if g0[k] == 0:
+            continue  # crossing already reported at end of previous step
+        if f1 is None:
+            f1 = obj.derivs(obj.y)
+        # Illinois false position, bracketed on [ta, tb] fractions of step
+        ta, ga, tb, gb = 0., g0[k], 1., g1[k]
+        side = 0
+        theta = 1.
+        for _ in range(max_iter):
+            theta = (ta * gb - tb * ga) / (gb - ga)
+            g = events[k](hermite(obj.yp, f0, obj.y, f1, theta, dt))
+            if g == 0 or (tb - ta) * dt < tol:
+                break
+            if g * gb > 0:
+                tb, gb = theta, g
+                if side == -1:
+                    ga /= 2
+                side = -1
+            else:
+                ta, ga = theta, g
+                if side == 1:
+                    gb /= 2
+                side = 1
+        found.append((k, theta * dt, hermite(obj.yp, f0, obj.y, f1, theta, dt)))
+    found.sort(key=lambda event_found: event_found[1])
+    return found
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""trim.py    Steady-state (trim) solution of model derivatives
+
+>>> def f(x):
+...     return [x[0] * x[0] - 4., x[0] + x[1] - 3.]
+>>> x, iterations = newton(f, [1., 1.])
+>>> [round(v, 9) for v in x]
+[2.0, 1.0]
+>>> newton(lambda x: [x[0] * x[0] + 1.], [1.], max_iter=5)  # doctest: +IGNORE_EXCEPTION_DETAIL
+Traceback (most recent call last):
+...
+Error: newton did not converge in 5 iterations
+"""
+import numpy as np
+
+
+class Error(Exception):
+    """Trim Error"""
+    pass
+
+
+def jacobian(func, x, f0=None, rel_step=1e-7):
+    """Forward difference Jacobian of func at x, reusing f0 = func(x) if given"""
+    x = np.array(x, dtype=float)
+    if f0 is None:
+        f0 = func(list(x))
+    f0 = np.asarray(f0, dtype=float)
+    jac = np.empty((len(f0), len(x)))
+    for j in range(len(x)):
+        h = rel_step * max(abs(x[j]), 1.)
+        xh = x.copy()
+        xh[j] += h
+        jac[:, j] = (np.asarray(func(list(xh)), dtype=float) - f0) / h
+    return jac
+
+
+def newton(func, x0, tol=1e-10, max_iter=50, rel_step=1e-7):
+    """Solve func(x) = 0 by Newton iteration on a finite difference Jacobian.
+    Converged when every step is within tol relative to max(|x|, 1).
+    Return (x, number of iterations); raise Error if not converged"""
+    x = np.array(x0, dtype=float)
+    for iteration in range(1, max_iter + 1):
+        f0 = np.asarray(func(list(x)), dtype=float)
+        try:
+            dx = np.linalg.solve(jacobian(func, x, f0, rel_step), -f0)
+        except np.linalg.LinAlgError:
+            raise Error('newton singular Jacobian at iteration %d' % iteration)
+        x += dx
+        if np.all(np.abs(dx) <= tol * np.maximum(np.abs(x), 1.)):
+            return [float(v) for v in x], iteration
+    raise Error('newton did not converge in %d iterations' % max_iter)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -162,12 +162,134 @@ asTemp (6 lines):
 5:This line was inserted, no line feed in input string
 <BLANKLINE>
 
+Lazy tokenizing, each line when first touched
+>>> lazy = InFile('temp', 'asLazy')
+>>> lazy.load()
+>>> lazy.tokenize(' .', lazy=True)
+>>> lazy.v_set.count(None)
+5
+>>> lazy[2][3]
+'third'
+>>> lazy.v_set.count(None)
+4
+>>> lazy.close_file()
+
+Columnar tokens, one text buffer and offset arrays for the whole file
+>>> columns = InFile('temp', 'asColumns')
+>>> columns.load()
+>>> columns.tokenize(' .', columnar=True)
+25
+>>> columns.max_line_length()
+6
+>>> columns[2][3], columns.token_store.line[:7].tolist()
+('third', [0, 0, 0, 0, 0, 0, 1])
+>>> columns.line_index is columns.token_store, columns.find_string('third')
+(True, 2)
+>>> columns.gsub('third', 'fourth')  # doctest: +IGNORE_EXCEPTION_DETAIL
+Traceback (most recent call last):
+TransitionError: gsub edits tokens, but columnar tokens are read-only; tokenize without columnar
+>>> columns.close_file()
+
+Line index, for repeated find_string over large files
+>>> indexed = InFile('temp', 'asIndexed')
+>>> indexed.load()
+>>> indexed.index_lines()
+>>> indexed.find_string('line', 1), indexed.find_string('fourth'), indexed.find_string('absent', 2)
+(2, 3, 4)
+>>> indexed.upcase()
+>>> indexed.line_index is None, indexed.find_string('FOURTH')
+(True, 3)
+>>> indexed.close_file()
+
+Memory mapped, read-only lines decoded when used
+>>> mapped = InFile('temp', 'asMapped')
+>>> mapped.load(mapped=True)
+>>> mapped.num_lines, mapped.line(3), mapped.find_string('may')
+(5, 'This is the fourth line.\n', 4)
+>>> mapped.tokenize(' .', lazy=True)
+>>> mapped[2][3]
+'third'
+>>> mapped.upcase()  # doctest: +IGNORE_EXCEPTION_DETAIL
+Traceback (most recent call last):
+TransitionError: upcase edits lines, but memory mapped lines are read-only; load() without mapped
+>>> mapped.close_file()
+
+Many substitutions in one pass
+>>> subs = InFile('temp', 'asSubs')
+>>> subs.load()
+>>> subs.gsub_many({'This': 'That', 'line': 'row', 'is': 'was'})
+[4, 4, 3]
+>>> subs.line(4)
+'That may be a row.\n'
+>>> subs.close_file()
+
+Preprocessing in one pass
+>>> prep = InFile('temp', 'asPrep')
+>>> prep.load()
+>>> prep.preprocess(comments=['may', 'fourth'], strip_blank=True, case='upper', delimiters=' .')
+{'substitutions': [], 'comments': 2, 'blank': 1, 'tokens': 18}
+>>> prep
+asPrep (4 lines):
+0:<000>THIS| <001>IS| <002>THE| <003>FIRST| <004>LINE|.<005>
+|
+1:<000>THIS| <001>IS| <002>THE| <003>THIRD| <004>LINE|.<005>
+|
+2:<000>THIS| <001>IS| <002>THE| <003>
+|
+3:<000>THIS| <001>
+|
+<BLANKLINE>
+>>> prep.close_file()
+
+Tokenizing while loading, in a pool of processes each sent a chunk of the lines
+>>> pooled = InFile('temp', 'asPooled')
+>>> pooled.load(delimiters=' .', processes=2)
+>>> pooled.v_set == [StringSet(line, ' .') for line in pooled.lines]
+True
+>>> pooled.close_file()
+>>> pooled.load(delimiters=' .', columnar=True, processes=2)
+>>> pooled.token_store.max_tokens(), pooled[4][1], pooled.find_string('may')
+(6, 'may', 4)
+>>> pooled.close_file()
+>>> edited = InFile('temp', 'asEdited')
+>>> edited.load()
+>>> edited.gsub('This', 'It')
+4
+>>> edited.tokenize_file(' .', processes=2, chunk_lines=2)
+25
+>>> edited.v_set == [StringSet(line, ' .') for line in edited.lines]
+True
+>>> edited.close_file()
+
+Streaming, one line at a time from the file with bounded memory
+>>> stream = InFile('temp', 'asStream')
+>>> [len(line_set) for line_set in stream.stream(' .')]
+[6, 1, 6, 6, 6]
+>>> stream.num_lines
+5
+>>> [line for line in stream.stream(comments=['is '], strip_blank=True)]
+['Th\n', 'Th\n', 'Th\n', 'Th\n']
+>>> stream.stream_counts
+{'substitutions': [], 'comments': 4, 'blank': 1}
+>>> [line for line in stream]
+['Th\n', 'Th\n', 'Th\n', 'Th\n']
+>>> stream.line(0)  # doctest: +IGNORE_EXCEPTION_DETAIL
+Traceback (most recent call last):
+TransitionError: line needs random access; use load() instead of streaming
+
 >>> infile.close_file()
 >>> import os
 >>> os.remove('temp')
 
 """
-from pyDAG3.TextProcessing.StringSet import StringSet
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
+import re
+import numpy as np
+from pyDAG3.TextProcessing.StringSet import MultiSub, StringSet
+from pyDAG3.TextProcessing.TokenStore import LineBuffer, TokenStore, tokenize_lines
+from pyDAG3.TextProcessing.MappedLines import MappedLines
 
 
 # Exceptions
@@ -205,6 +327,38 @@ class TransitionError(Error):
         self.next_state = next_state
         self.message = message
 
+    def __str__(self):
+        return self.message
+
+
+def preprocessed_lines(lines, counts, substitutions=None, comments=None, case=None, strip_blank=False):
+    """Generate lines after, in order, substitutions (pairs or dict, see MultiSub),
+    stripping comments from any of the comments delimiters to end of line, case
+    change ('upper' or 'lower'), and dropping blank lines if strip_blank.  All in
+    one pass.  Adds to counts entries 'substitutions' (list by pair), 'comments'
+    (lines with a comment stripped) and 'blank' (lines dropped)"""
+    multi_sub = MultiSub(substitutions) if substitutions else None
+    counts.setdefault('substitutions', [0] * (len(multi_sub) if multi_sub else 0))
+    counts.setdefault('comments', 0)
+    counts.setdefault('blank', 0)
+    comment = re.compile('|'.join(re.escape(delim) for delim in comments)) if comments else None
+    for line in lines:
+        if multi_sub:
+            line = multi_sub.sub(line, counts['substitutions'])
+        if comment:
+            found = comment.search(line)
+            if found:
+                counts['comments'] += 1
+                line = line[:found.start()] + ('\n' if line[-1] == '\n' else '')
+        if case == 'upper':
+            line = line.upper()
+        elif case == 'lower':
+            line = line.lower()
+        if strip_blank and not line.strip():
+            counts['blank'] += 1
+            continue
+        yield line
+
 
 class InFile:
     """Load, parse, and manipulate input files.  Supports gzip automatically
@@ -222,6 +376,8 @@ class InFile:
                 raise InputError("", "no source file specified")
         # Process the inputs
         self.v_set = None         # list of StringSet
+        self.token_store = None  # TokenStore instead of v_set if tokenized columnar
+        self.line_index = None  # LineBuffer of lines for find_string, if index_lines run since lines changed
         self.inFile = src_file  # the source file
         self.f = None          # filename pointer
         self.lines = None      # list of line strings
@@ -237,14 +393,20 @@ class InFile:
         self.max_line_tokens = 0  # stored value of maximum line length, in tokens
         self.counted = 0  # whether maximum line length is counted
         self.loaded = 0   # whether readlines already run on self.f
+        self.streaming = 0  # whether lines are read one at a time by stream(), not held
+        self.mapped = 0  # whether lines are MappedLines, read-only from a memory map
         self.n_iter = 0  # iteration counter
+        self.stream_counts = None  # counts of preprocessed_lines while streaming
+        self.stream_args = None  # (delimiters, preprocessing) of the last stream, reused by iteration
 
     def __repr__(self):
         """Print the class"""
         cout = '%(name)s (%(num_lines)d lines):\n' \
             % {'name': self.programName, 'num_lines': self.num_lines}
+        if self.streaming:
+            return cout
         if self.tokenized:
-            slist = ['%(i)d:%(line)s\n' % {'i': i, 'line': self.v_set[i]} for i in range(self.num_lines)]
+            slist = ['%(i)d:%(line)s\n' % {'i': i, 'line': self.line_set(i)} for i in range(self.num_lines)]
         else:
             slist = ['%(i)d:%(line)s' % {'i': i, 'line': self.lines[i]} for i in range(self.num_lines)]
         cout += "".join(slist)
@@ -252,29 +414,40 @@ class InFile:
 
     def line(self, i):
         """Return the line string demanded but always in-range"""
+        self.random_access('line')
         # limited_index = max(min(i, len(self.lines)-1), 0)
         limited_index = i
         return '%(line)s' % {'line': self.lines[limited_index]}
 
     def line_set(self, i):
         """Return the tokenized representation of line i, always in range"""
+        self.random_access('line_set')
         # Check input
         # if __debug__:
         #     if not self.tokenized:
         #         raise InputError("", "must run InFile.tokenize before look in InFile.line_set")
         # limited_index = max(min(i, len(self.v_set)-1), 0)
         limited_index = i
+        if self.tokenized and self.token_store is not None:
+            return self.token_store.line_set(limited_index)
         if self.tokenized:
-            return self.v_set[limited_index]
+            v_set = self.v_set[limited_index]
+            if v_set is None:
+                v_set = self.v_set[limited_index] = StringSet(self.lines[limited_index], self.token_delims)
+            return v_set
         else:
             return self.line(limited_index)
 
     def add_line(self, after_line, new_line_str):
         """Insert line of string new_line_str after line after_line"""
+        self.random_access('add_line')
+        self.editable_lines('add_line')
         if not new_line_str[len(new_line_str)-1] == '\n':
             new_line_str += '\n'
         self.lines[(after_line+1):(after_line+1)] = [new_line_str]
+        self.line_index = None
         if self.tokenized:
+            self.editable_tokens('add_line')
             vs = StringSet(new_line_str, self.token_delims)
             self.v_set[(after_line+1):(after_line+1)] = [vs]
         self.num_lines = len(self.lines)
@@ -284,20 +457,33 @@ class InFile:
 
     def delete_line(self, line_index):
         """Delete line and readjust internal arrays"""
+        self.random_access('delete_line')
+        self.editable_lines('delete_line')
+        self.editable_tokens('delete_line')
         del self.v_set[line_index]
         self.num_lines = len(self.lines)
 
     def downcase(self, start_line=0, end_line=None):
         """Downcase all the text lines in specified line range"""
+        self.random_access('downcase')
+        self.editable_lines('downcase')
         if end_line:
             end_line = max(min(end_line, self.num_lines-1), 0)
         start_line = max(min(start_line, end_line), 0)
         for i in range(start_line, end_line):
             self.lines[i] = self.lines[i].lower()
+        self.line_index = None
         self.reconstructed = 0
 
     def find_string(self, target, start_line=0):
         """Number of line containing first 'target' in lines after 'start_line'"""
+        self.random_access('find_string')
+        if self.line_index is not None:
+            first = max(min(start_line, self.num_lines), 0)
+            found = self.line_index.find(target, first)
+            if found < 0:
+                found = self.num_lines - 1
+            return start_line + found - first
         offset = -1
         for line in self.lines[max(min(start_line, self.num_lines), 0):]:
             offset += 1
@@ -316,12 +502,14 @@ class InFile:
         if not self.lines:
             self.lines = [new_line]
         else:
-            self.lines += [new_line]
+            self.lines.append(new_line)
         self.num_lines = len(self.lines)
+        self.line_index = None
         return new_line
 
     def gsub(self, target, replace, start_line=0, end_line=None):
         """Global substitution in lines or StringSets(if tokenized); return total number of replacements"""
+        self.random_access('gsub')
         if end_line:
             end_line = max(min(end_line, self.num_lines), 0)
         else:
@@ -329,19 +517,47 @@ class InFile:
         start_line = max(min(start_line, end_line), 0)
         count = 0
         if not self.tokenized:
+            self.editable_lines('gsub')
             if not target == replace:
+                self.line_index = None
                 for i in range(start_line, end_line):
                     count += self.lines[i].count(target)
                     self.lines[i] = self.lines[i].replace(target, replace)
         else:
+            self.editable_tokens('gsub')
             if not target == replace:
                 for i in range(start_line, end_line):
-                    count += self.v_set[i].gsub(target, replace)
+                    count += self.line_set(i).gsub(target, replace)
         return count
 
+    def gsub_many(self, pairs, start_line=0, end_line=None):
+        """Global substitution of many (target, replacement) pairs, or a dict of them, in lines
+        or StringSets(if tokenized), all in one pass; return list of number of replacements by pair"""
+        self.random_access('gsub_many')
+        if end_line:
+            end_line = max(min(end_line, self.num_lines), 0)
+        else:
+            end_line = self.num_lines
+        start_line = max(min(start_line, end_line), 0)
+        substitutions = MultiSub(pairs)
+        counts = [0] * len(substitutions)
+        if not self.tokenized:
+            self.editable_lines('gsub_many')
+            self.line_index = None
+            for i in range(start_line, end_line):
+                self.lines[i] = substitutions.sub(self.lines[i], counts)
+        else:
+            self.editable_tokens('gsub_many')
+            for i in range(start_line, end_line):
+                line_counts = self.line_set(i).gsub_many(substitutions)
+                counts = [count + line_count for count, line_count in zip(counts, line_counts)]
+        return counts
+
     def glob_sub_delims(self, target, replace, start_line=0, end_line=None):
         """Globally substitute target with replace in the specified range of tokenized file memory;
          return total number of replacements"""
+        self.random_access('glob_sub_delims')
+        self.editable_tokens('glob_sub_delims')
         if __debug__:
             if not self.tokenized:
                 raise InputError("", "must be tokenized")
@@ -352,27 +568,56 @@ class InFile:
         count = 0
         if not target == replace:
             for i in range(start_line, end_line):
-                count += self.v_set[i].glob_sub_delims(target, replace)
+                count += self.line_set(i).glob_sub_delims(target, replace)
         return count
 
+    def index_lines(self):
+        """Index the lines so find_string searches one buffer.  Editing the lines by
+        InFile methods drops the index; run again after editing self.lines directly"""
+        self.random_access('index_lines')
+        if not self.mapped:
+            self.line_index = LineBuffer(self.lines)
+
     def __len__(self):
         """The number of lines"""
         return self.num_lines
 
-    def load(self, quiet=True):
-        """Load the file"""
+    def split_file_name(self):
+        """Find file_root and file_extension of the source file name"""
         in_file_set = StringSet(self.inFile, "/.")
         if len(in_file_set) > 2:
             self.file_extension = in_file_set[len(in_file_set)-1]
         self.file_root = in_file_set[0]
+
+    def open_file(self):
+        """Open the source file, gzip if its extension is gz"""
+        self.split_file_name()
         if self.file_extension == 'gz':
             import gzip
             self.f = gzip.open(self.inFile)
         else:
             self.f = open(self.inFile, 'r')
-        self.lines = self.f.readlines()
+
+    def load(self, quiet=True, mapped=False, delimiters=None, columnar=False, processes=1):
+        """Load the file.  If mapped, memory map it read-only and read lines on demand.
+        If delimiters, tokenize as loaded, in processes if not 1 (see tokenize_file);
+        use columnar with processes, as only columnar tokenizing scales with them"""
+        if mapped:
+            self.split_file_name()
+            if self.file_extension == 'gz':
+                raise InputError(self.inFile, "cannot memory map a gzip file")
+            self.f = self.lines = MappedLines(self.inFile)
+            self.line_index = self.lines  # searches the map directly
+        else:
+            self.open_file()
+            self.lines = self.f.readlines()
+            self.line_index = None
+        self.mapped = 1 if mapped else 0
+        self.streaming = 0
         self.num_lines = len(self.lines)
         self.loaded = 1
+        if delimiters:
+            self.tokenize_file(delimiters, columnar, processes)
         if not quiet:
             print('loaded', self.inFile, 'root=', self.file_root,
                   'num_lines=', self.num_lines, ' extension=', self.file_extension)
@@ -380,6 +625,7 @@ class InFile:
     def load_vars(self):
         """Load variable vector data, using text (isnum) as delimiter.
         Useful for reading general input data files"""
+        self.random_access('load_vars')
         if __debug__:
             if self.tokenized:
                 raise InputError("", "must not be tokenized yet")
@@ -416,43 +662,59 @@ class InFile:
 
     def max_line_length(self):
         """Determine length of longest line, in tokens"""
+        self.random_access('max_line_length')
         if self.counted:
             print('WARNING(InFile):  max_line_length : already counted.  Returning stored value')
             return self.max_line_tokens
         elif not self.tokenized:
             return 1
+        elif self.token_store is not None:
+            self.counted = 1
+            self.max_line_tokens = self.token_store.max_tokens()
         else:
             self.counted = 1
-            for v_set in self.v_set:
-                self.max_line_tokens = max(self.max_line_tokens, len(v_set))
+            for i in range(self.num_lines):
+                self.max_line_tokens = max(self.max_line_tokens, len(self.line_set(i)))
         return self.max_line_tokens
 
     def reconstruct(self):
         """Reconstruct the tokenized memory back into the lines"""
+        self.random_access('reconstruct')
+        self.editable_lines('reconstruct')
         if __debug__:
             if not self.tokenized:
                 raise InputError("", "must be tokenized")
             if self.reconstructed:
                 raise InputError("", "reconstructed already")
-        for i in range(self.num_lines):
-            self.lines[i] = self.v_set[i].reconstruct()
+        if self.token_store is None:  # columnar tokens are never edited
+            for i in range(self.num_lines):
+                if self.v_set[i] is not None:  # untouched lazy lines are unchanged
+                    self.lines[i] = self.v_set[i].reconstruct()
+        self.token_store = None
+        self.line_index = None
         self.reconstructed = 1
         self.tokenized = 0
 
     def shorten_delimiter(self, line_index, i):
         """Delete last char of i'th delimiter in tokenized line line_index"""
+        self.random_access('shorten_delimiter')
+        self.editable_tokens('shorten_delimiter')
         if __debug__:
             if not self.tokenized:
                 raise InputError("", "must be tokenized")
             if line_index >= self.num_lines:
                 raise InputError("", "line number out of range")
-        self.v_set[line_index].shorten_delimiter(i)
+        self.line_set(line_index).shorten_delimiter(i)
         self.reconstructed = 0
 
     def sort(self):
         """Sort"""
+        self.random_access('sort')
+        self.editable_lines('sort')
         self.lines.sort()
+        self.line_index = None
         self.v_set = []
+        self.token_store = None
         # whether tokenized then reconstructed
         self.reconstructed = 0
         self.tokenized = 0    # whether tokenized
@@ -463,8 +725,9 @@ class InFile:
 
     def sout(self):
         """Stream the class"""
+        self.random_access('sout')
         if self.tokenized:
-            slist = ['%(line)s\n' % {'line': self.v_set[i].reconstruct()} for i in range(self.num_lines)]
+            slist = ['%(line)s\n' % {'line': self.line_set(i).reconstruct()} for i in range(self.num_lines)]
             cout = "".join(slist)
         else:
             slist = ['%(line)s\n' % {'line': self.lines[i]} for i in range(self.num_lines)]
@@ -473,6 +736,8 @@ class InFile:
 
     def strip_blank_lines(self, end_line=None):
         """Strip lines containing only white, in specified line range; return number of lines remaining"""
+        self.random_access('strip_blank_lines')
+        self.editable_lines('strip_blank_lines')
         # Check input
         if __debug__:
             if self.tokenized:
@@ -481,22 +746,28 @@ class InFile:
             end_line = max(min(end_line, self.num_lines), 0)
         else:
             end_line = self.num_lines
-        num_blank_lines = 0
-        i = 0
-        while i < end_line:
-            if not len(self.lines[i].strip()):
-                self.lines.pop(i)
-                num_blank_lines += 1
-                i = i - 1
-                self.num_lines -= 1
-                end_line = max(min(end_line, self.num_lines), 0)
-            i += 1
+        self.line_index = None
+        # Scan until end_line lines are kept, then splice once
+        kept = []
+        scanned = 0
+        for line in self.lines:
+            if len(kept) >= end_line:
+                break
+            scanned += 1
+            if line.strip():
+                kept.append(line)
+        num_blank_lines = scanned - len(kept)
+        self.lines[:scanned] = kept
+        self.num_lines = len(self.lines)
         if self.num_lines == 0:
             print('WARNING(InFile):  strip_blank_lines : ', self.inFile, 'is empty after stripping white space')
         return num_blank_lines
 
     def strip_comments(self, comment_delim):
         """Strip comments from delimiter to end of line, in specified line range; return number of comments stripped"""
+        self.random_access('strip_comments')
+        self.editable_lines('strip_comments')
+        self.line_index = None
         num_comment_str = 0
         for i in range(self.num_lines):
             if self.lines[i].find(comment_delim) > -1:
@@ -522,6 +793,9 @@ class InFile:
         return self.line_set(i)
 
     def __iter__(self):
+        if self.streaming:
+            delimiters, preprocessing = self.stream_args
+            return self.stream(delimiters, **preprocessing)
         self.n_iter = 0
         return self
 
@@ -537,13 +811,101 @@ class InFile:
         else:
             raise StopIteration
 
-    def tokenize(self, delimiters):
-        """Tokenize each line of file into a StringSet.  Return total number of tokens"""
+    def preprocess(self, comments=None, strip_blank=False, case=None, delimiters=None, substitutions=None,
+                   lazy=False, columnar=False):
+        """Substitute, strip comments, change case and strip blank lines in one pass
+        (see preprocessed_lines), then tokenize if delimiters given (see tokenize).
+        Return dictionary of counts of 'substitutions', 'comments', 'blank' and 'tokens'"""
+        self.random_access('preprocess')
+        self.editable_lines('preprocess')
+        if __debug__:
+            if self.tokenized:
+                raise InputError("", "run before tokenizing")
+        counts = {}
+        self.lines = list(preprocessed_lines(self.lines, counts, substitutions, comments, case, strip_blank))
+        self.num_lines = len(self.lines)
+        self.line_index = None
+        self.reconstructed = 0
+        if strip_blank and self.num_lines == 0:
+            print('WARNING(InFile):  preprocess : ', self.inFile, 'is empty after stripping white space')
+        counts['tokens'] = self.tokenize(delimiters, lazy, columnar) if delimiters else None
+        return counts
+
+    def random_access(self, operation):
+        """Raise TransitionError if streaming, when operation needs the lines held in memory"""
+        if self.streaming:
+            raise TransitionError('streaming', operation,
+                                  '%(op)s needs random access; use load() instead of streaming' % {'op': operation})
+
+    def editable_lines(self, operation):
+        """Raise TransitionError if memory mapped, when operation edits lines"""
+        if self.mapped:
+            raise TransitionError('mapped', operation,
+                                  '%(op)s edits lines, but memory mapped lines are read-only; load() without mapped'
+                                  % {'op': operation})
+
+    def editable_tokens(self, operation):
+        """Raise TransitionError if tokenized columnar, when operation edits tokens"""
+        if self.tokenized and self.token_store is not None:
+            raise TransitionError('columnar', operation,
+                                  '%(op)s edits tokens, but columnar tokens are read-only; tokenize without columnar'
+                                  % {'op': operation})
+
+    def stream(self, delimiters=None, **preprocessing):
+        """Generate the lines of the file one at a time, as StringSets if delimiters
+        given, without holding them.  num_lines counts the lines generated so far.
+        Keywords of preprocessed_lines (comments, strip_blank, case, substitutions)
+        preprocess each line on the way.  Iterating the InFile afterwards streams
+        again the same way"""
+        if self.f is not None:
+            self.f.close()  # a loaded file, memory map or earlier stream
+        self.open_file()
+        f = self.f
+        self.stream_args = (delimiters, preprocessing)
+        self.lines = None
+        self.v_set = None
+        self.token_store = None
+        self.line_index = None
+        self.num_lines = 0
+        self.loaded = 0
+        self.mapped = 0
+        self.tokenized = 0
+        self.streaming = 1
+        lines = f
+        if preprocessing:
+            self.stream_counts = {}
+            lines = preprocessed_lines(f, self.stream_counts, **preprocessing)
+        try:
+            for new_line in lines:
+                self.num_lines += 1
+                if delimiters:
+                    yield StringSet(new_line, delimiters)
+                else:
+                    yield new_line
+        finally:
+            f.close()
+
+    def tokenize(self, delimiters, lazy=False, columnar=False):
+        """Tokenize each line of file into a StringSet.  Return total number of tokens.
+        If lazy, defer each StringSet until line_set first touches its line and return None.
+        If columnar, hold all tokens read-only in one TokenStore instead"""
+        self.random_access('tokenize')
         self.v_set = []
+        self.token_store = None
         num_tokens = 0
         self.token_delims = delimiters
         if self.num_lines:
             self.reconstructed = 0
+        if columnar:
+            self.v_set = None
+            self.token_store = TokenStore(self.lines, delimiters)
+            self.line_index = self.token_store  # find_string searches its buffer
+            self.tokenized = 1
+            return len(self.token_store.token_start)
+        if lazy:
+            self.v_set = [None] * self.num_lines
+            self.tokenized = 1
+            return None
         for i in range(self.num_lines):
             self.v_set.append(StringSet(self.lines[i], delimiters))
             num_tokens += len(self.v_set[len(self.v_set)-1])
@@ -551,8 +913,41 @@ class InFile:
         self.reconstructed = 0
         return num_tokens
 
+    def tokenize_file(self, delimiters, columnar=False, processes=None, chunk_lines=None):
+        """Tokenize the lines, like tokenize, in chunks of chunk_lines lines sent to a
+        pool of processes (None for one per cpu).  Return total number of tokens.
+        Only columnar scales with processes:  otherwise this process still builds
+        a StringSet per line, which costs about half of a serial tokenize"""
+        self.random_access('tokenize_file')
+        if processes == 1:
+            return self.tokenize(delimiters, columnar=columnar)
+        workers = processes or os.cpu_count()
+        if chunk_lines is None:
+            chunk_lines = max(self.num_lines // (4 * workers) + 1, 10000)
+        chunks = [self.lines[i:i + chunk_lines] for i in range(0, self.num_lines, chunk_lines)]
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(tokenize_lines, chunks, itertools.repeat(delimiters)))
+        counts = np.concatenate([part[0] for part in parts] + [np.zeros(0, dtype=np.int64)])
+        bounds = np.concatenate([part[1] for part in parts] + [np.zeros((0, 2), dtype=np.int64)])
+        self.token_delims = delimiters
+        self.reconstructed = 0
+        self.tokenized = 1
+        if columnar:
+            self.v_set = None
+            self.token_store = TokenStore(self.lines, delimiters, counts, bounds)
+            self.line_index = self.token_store
+        else:
+            self.token_store = None
+            first = np.concatenate(([0], 2 * np.cumsum(counts))).tolist()
+            flat = bounds.ravel().tolist()
+            self.v_set = [StringSet.from_bounds(self.lines[i], delimiters, flat[first[i]:first[i + 1]])
+                          for i in range(self.num_lines)]
+        return int(counts.sum())
+
     def upcase(self, start_line=0, end_line=None):
         """Upcase all the text lines in specified line range"""
+        self.random_access('upcase')
+        self.editable_lines('upcase')
         if end_line:
             end_line = max(min(end_line, self.num_lines-1), 0)
         else:
@@ -560,6 +955,7 @@ class InFile:
         start_line = max(min(start_line, end_line), 0)
         for i in range(start_line, end_line):
             self.lines[i] = self.lines[i].upper()
+        self.line_index = None
         self.reconstructed = 0
 
 
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+r"""MappedLines:  read-only lines of a memory mapped text file
+
+Tests:
+
+>>> from pyDAG3.TextProcessing.MappedLines import MappedLines
+>>> with open('temp_mapped', 'w') as tf:
+...     n = tf.write('$FTIME 10\n\n$INPUT A 1\r\nlast line, no line feed')
+>>> lines = MappedLines('temp_mapped')
+>>> len(lines), lines.line_starts.tolist()
+(4, [0, 10, 11, 23, 46])
+>>> lines[2], lines[-1]
+('$INPUT A 1\n', 'last line, no line feed')
+>>> lines[1:3]
+['\n', '$INPUT A 1\n']
+>>> lines.find('$INPUT'), lines.find('$INPUT', 3), lines.find('10\n$')
+(2, -1, -1)
+>>> lines.close()
+>>> lines = MappedLines('temp_mapped', block=4)
+>>> lines.line_starts.tolist()
+[0, 10, 11, 23, 46]
+>>> lines.close()
+>>> import os
+>>> os.remove('temp_mapped')
+"""
+
+import locale
+import mmap
+import numpy as np
+
+
+class MappedLines:
+    """Sequence of the lines of a file read on demand from a read-only memory
+    map.  Only the byte offset of each line start is held, found by a
+    vectorized newline search over block bytes at a time, so opening is fast,
+    memory stays bounded and processes share the page cache.  Lines decode
+    like a text mode read, with \r\n read as \n"""
+
+    def __init__(self, path, encoding=None, block=16 << 20):
+        self.path = path
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.f = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self.map = b''
+        size = len(self.map)
+        ends = []  # offsets after each line feed, one array per block
+        for start in range(0, size, block):
+            data = np.frombuffer(self.map, dtype=np.uint8, count=min(block, size - start), offset=start)
+            ends.append(np.flatnonzero(data == ord('\n')) + (start + 1))
+        num_ends = sum(map(len, ends))
+        unterminated = int(size > 0 and self.map[size - 1] != ord('\n'))  # last line has no line feed
+        self.line_starts = np.empty(num_ends + 1 + unterminated, dtype=np.int64)  # line i spans line_starts[i:i+2]
+        self.line_starts[0] = 0
+        if ends:
+            np.concatenate(ends, out=self.line_starts[1:num_ends + 1])
+        if unterminated:
+            self.line_starts[-1] = size
+
+    def __len__(self):
+        """The number of lines"""
+        return len(self.line_starts) - 1
+
+    def _decode(self, data):
+        text = data.decode(self.encoding)
+        if text.endswith('\r\n'):
+            text = text[:-2] + '\n'
+        return text
+
+    def __getitem__(self, i):
+        """Line i, or list of lines for a slice"""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('MappedLines index out of range')
+        return self._decode(self.map[self.line_starts[i]:self.line_starts[i + 1]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def line_of(self, offset):
+        """Number of the line holding byte offset"""
+        return int(np.searchsorted(self.line_starts, offset, side='right')) - 1
+
+    def find(self, target, start_line=0):
+        """Number of first line from start_line containing target, -1 if none"""
+        if not 0 <= start_line < len(self):
+            return -1
+        target = target.encode(self.encoding)
+        position = self.map.find(target, self.line_starts[start_line])
+        while position >= 0:
+            line = self.line_of(position)
+            if position + len(target) <= self.line_starts[line + 1]:
+                return line
+            position = self.map.find(target, position + 1)  # match spanned lines
+        return -1
+
+    def close(self):
+        """Release the map and the file"""
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.f.close()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
@@ -87,13 +87,92 @@ Token details:
 ['', 'rdg100Small', 'txt']
 >>> ss.reconstruct()
 './rdg100Small.txt'
+
+Delimiter patterns are compiled once and shared:
+>>> delimiter_pattern("./") is delimiter_pattern("./")
+True
+
+Tokens are held as offsets into str until edited:
+>>> ss = StringSet('a.b..c', '.')
+>>> list(ss._bounds)
+[0, 1, 2, 3, 5, 6]
+>>> ss[-1], ss._tokens is None
+('c', True)
+>>> ss.gsub('b', 'B'), ss.reconstruct()
+(1, 'a.B..c')
+>>> StringSet.from_bounds('a.b..c', '.', [0, 1, 2, 3, 5, 6]) == StringSet('a.b..c', '.')
+True
+
+Many substitutions at once, each match replaced in one pass:
+>>> ss = StringSet('$INPUT X, $INPUT Y\n', ' ,')
+>>> ss.gsub_many([('$INPUT', 'INPUT'), ('X', 'Y'), ('Y', 'X')])
+[2, 1, 1]
+>>> ss.reconstruct()
+'INPUT Y, INPUT X\n'
 """
 
 import re
+from array import array
+from itertools import accumulate
+
+
+_DELIMITER_PATTERNS = {}  # compiled delimiter run patterns by delimiter string
+
+
+def delimiter_pattern(delimiters):
+    """Compiled regular expression capturing a run of any of the delimiters, cached.
+    Its split alternates tokens and delimiter runs"""
+    pattern = _DELIMITER_PATTERNS.get(delimiters)
+    if pattern is None:
+        pattern = _DELIMITER_PATTERNS[delimiters] = re.compile("([" + re.escape(delimiters) + "]+)")
+    return pattern
+
+
+class MultiSub:
+    """Many target to replacement substitutions compiled into one alternation,
+    so a single scan of a string makes all of them.  Where targets overlap the
+    longest match at a position wins.  Pairs with an empty target, a target
+    equal to its replacement, or a repeated target are never applied"""
+
+    def __init__(self, pairs):
+        if isinstance(pairs, dict):
+            pairs = pairs.items()
+        self.targets = []
+        self.replacements = []
+        self.index = {}  # pair number of each applied target
+        for i, (target, replacement) in enumerate(pairs):
+            self.targets.append(target)
+            self.replacements.append(replacement)
+            if target and target != replacement and target not in self.index:
+                self.index[target] = i
+        if self.index:
+            self.pattern = re.compile('|'.join(re.escape(target) for target in
+                                               sorted(self.index, key=len, reverse=True)))
+        else:
+            self.pattern = None
+
+    def __len__(self):
+        """The number of pairs"""
+        return len(self.targets)
+
+    def sub(self, text, counts):
+        """Return text with all substitutions made, adding the number of each to counts"""
+        if self.pattern is None:
+            return text
+
+        def replace(match):
+            i = self.index[match.group()]
+            counts[i] += 1
+            return self.replacements[i]
+        return self.pattern.sub(replace, text)
 
 
 class StringSet:
-    """Create string sets from lines for easy file text manipulation"""
+    """Create string sets from lines for easy file text manipulation.
+    Token and delimiter boundaries are kept as integer offsets into str; the
+    tokens and delims lists are built on first use and hold any edits"""
+    __slots__ = ('str', '_bounds', '_tokens', '_delims', 'size_tokens', 'size_delimiters', 'tokenized',
+                 'delimiters', 'n_iter')
 
     def __eq__(self, other):
         """== special class method"""
@@ -113,9 +192,10 @@ class StringSet:
 
     def __init__(self, source_str=None, delimiters=None):
         self.str = source_str
-        self.tokens = []
+        self._bounds = array('I')  # start, end of each token; delimiter i spans end i to start i+1
+        self._tokens = None  # token strings once built from _bounds
+        self._delims = None  # delimiter strings once built from _bounds
         self.size_tokens = 0
-        self.delims = []
         self.size_delimiters = 0
         self.tokenized = 0
         self.delimiters = ''
@@ -125,6 +205,54 @@ class StringSet:
             self.tokenized = 1
         self.n_iter = 0
 
+    @property
+    def tokens(self):
+        """List of tokens, built from the offsets on first use"""
+        if self._tokens is None:
+            self._tokens = [self._token(i) for i in range(self.size_tokens)]
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, tokens):
+        self._tokens = tokens
+
+    @property
+    def delims(self):
+        """List of delimiters following each token, built from the offsets on first use"""
+        if self._delims is None:
+            bounds = self._bounds
+            self._delims = [self.str[bounds[2*i+1]:bounds[2*i+2]] for i in range(self.size_tokens - 1)]
+            if self.size_tokens:
+                self._delims.append('')
+        return self._delims
+
+    @delims.setter
+    def delims(self, delims):
+        self._delims = delims
+
+    def _token(self, i):
+        """Token i read through the offsets"""
+        if i < 0:
+            i += self.size_tokens
+        if not 0 <= i < self.size_tokens:
+            raise IndexError('StringSet token index out of range')
+        return self.str[self._bounds[2*i]:self._bounds[2*i+1]]
+
+    @classmethod
+    def from_bounds(cls, source_str, delimiters, bounds):
+        """StringSet of source_str already tokenized by delimiters into tokens
+        with (start, end) offsets listed flat in bounds, as from tokenize"""
+        string_set = cls.__new__(cls)
+        string_set.str = source_str
+        string_set._bounds = array('I', bounds)
+        string_set._tokens = None
+        string_set._delims = None
+        string_set.size_tokens = string_set.size_delimiters = len(string_set._bounds) // 2
+        string_set.tokenized = 1
+        string_set.delimiters = delimiters
+        string_set.n_iter = 0
+        return string_set
+
     def __len__(self):
         """String length if not tokenized, otherwise number tokens."""
         if self.tokenized:
@@ -156,7 +284,7 @@ class StringSet:
         """Enable iteration"""
         if self.n_iter < self.size_tokens:
             if self.tokenized:
-                result = self.tokens[self.n_iter]
+                result = self[self.n_iter]
             else:
                 result = self.str
             self.n_iter += 1
@@ -196,6 +324,18 @@ class StringSet:
                 changed -= self.tokens[i].count(target)
         return changed
 
+    def gsub_many(self, pairs):
+        """Global token replace of many (target, replacement) pairs, or a dict or
+        MultiSub of them, in one pass; return list of number of replacements by pair"""
+        substitutions = pairs if isinstance(pairs, MultiSub) else MultiSub(pairs)
+        counts = [0] * len(substitutions)
+        for i in range(self.size_tokens):
+            token = self[i]
+            new_token = substitutions.sub(token, counts)
+            if new_token is not token:
+                self.tokens[i] = new_token
+        return counts
+
     def glob_sub_delims(self, target, replacement):
         """Global delimiter replace, return number of replacements"""
         changed = 0
@@ -208,6 +348,8 @@ class StringSet:
 
     def reconstruct(self):
         """Reconstruct the tokenized version and return it"""
+        if self.size_tokens and self._tokens is None and self._delims is None:
+            return self.str  # unedited
         if self.size_delimiters:
             if not self.size_tokens:
                 cout = '%(d0)s' % {'d0': self.delims[0]}
@@ -235,6 +377,8 @@ class StringSet:
 
     def __getitem__(self, i):
         """Return an element"""
+        if self._tokens is None and isinstance(i, int):
+            return self._token(i)
         return self.tokens[i]
 
     def tokenize(self, delimiters, save_delims=True):
@@ -242,27 +386,23 @@ class StringSet:
         save tokens and delimiters"""
         # Initialize
         self.delimiters = delimiters
+        self._bounds = array('I')
+        self._tokens = None
+        self._delims = None
         if self.tokenized:
-            self.tokens = []
             self.size_tokens = 0
-            self.delims = []
             self.size_delimiters = 0
             self.tokenized = 0
         if not self.str:
             return
-        reg_exp = re.compile("[" + re.escape(delimiters) + "]+")
-        self.tokens = reg_exp.split(self.str)
+        # One pass finds tokens and the delimiter runs between them; keep only their offsets
+        parts = delimiter_pattern(delimiters).split(self.str)
+        self._bounds = array('I', accumulate(map(len, parts), initial=0))
         self.tokenized = 1
-        if save_delims:
-            self.delims = []
-            raw_delims = reg_exp.findall(self.str)
-            for strg in raw_delims:
-                if strg:
-                    self.delims.append(strg)
-        self.size_tokens = len(self.tokens)
-        while len(self.delims) < self.size_tokens:
-            self.delims.append('')
-        self.size_delimiters = len(self.delims)
+        self.size_tokens = len(parts) // 2 + 1
+        if not save_delims:
+            self._delims = [''] * self.size_tokens
+        self.size_delimiters = self.size_tokens
 
 
 if __name__ == '__main__':
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+r"""TokenStore:  columnar token store of a whole file, and the line buffer under it
+
+Tests:
+
+>>> from pyDAG3.TextProcessing.TokenStore import *
+>>> index = LineBuffer(['$FTIME 10\n', '$INPUT A 1\n', '0 1\n', '$INPUT B 1\n'])
+>>> index.find('$INPUT'), index.find('$INPUT', 2), index.find('$INPUT', 4), index.find('1\n$')
+(1, 3, -1, -1)
+>>> index.line_of(12)
+1
+>>> store = TokenStore(['$INPUT X 1\n', '\n', '  0.0, 1.0\n'], ' ,\n')
+>>> store.buffer
+'$INPUT X 1\n\n  0.0, 1.0\n'
+>>> store.line.tolist()
+[0, 0, 0, 0, 1, 1, 2, 2, 2, 2]
+>>> store.token_start.tolist(), store.delim_end.tolist()
+([0, 7, 9, 11, 11, 12, 12, 14, 19, 23], [7, 9, 11, 11, 12, 12, 14, 19, 23, 23])
+>>> store.tokens_per_line().tolist()
+[4, 2, 4]
+>>> store.max_tokens()
+4
+
+Lines are read through lightweight views that print like a StringSet:
+>>> view = store.line_set(2)
+>>> len(view), view[1], view[-2]
+(4, '0.0', '1.0')
+>>> view.tokens, view.delims
+(['', '0.0', '1.0', ''], ['  ', ', ', '\n', ''])
+>>> view
+<000>|  <001>0.0|, <002>1.0|
+<003>|
+>>> view.reconstruct()
+'  0.0, 1.0\n'
+
+Tokenizing in chunks of lines, e.g. across a pool of processes, then merging:
+>>> parts = [tokenize_lines(chunk, ' ,\n') for chunk in (['$INPUT X 1\n'], ['\n', '  0.0, 1.0\n'])]
+>>> counts = np.concatenate([part[0] for part in parts])
+>>> bounds = np.concatenate([part[1] for part in parts])
+>>> merged = TokenStore(['$INPUT X 1\n', '\n', '  0.0, 1.0\n'], ' ,\n', counts, bounds)
+>>> bool(np.array_equal(merged.delim_end, store.delim_end))
+True
+"""
+
+from array import array
+from itertools import accumulate
+import numpy as np
+from pyDAG3.TextProcessing.StringSet import StringSet, delimiter_pattern
+
+
+def tokenize_lines(lines, delimiters):
+    """Number of tokens of each line, and (start, end) of each token within its
+    line, as int64 arrays (lines) and (tokens, 2)"""
+    counts = np.zeros(len(lines), dtype=np.int64)
+    bounds = array('q')
+    split = delimiter_pattern(delimiters).split
+    for i, line in enumerate(lines):
+        if line:
+            parts = split(line)
+            counts[i] = len(parts) // 2 + 1
+            bounds.extend(accumulate(map(len, parts), initial=0))
+    return counts, np.frombuffer(bounds, dtype=np.int64).reshape(-1, 2)
+
+
+class LineBuffer:
+    """Lines joined in one text buffer with the offset of each line start, so
+    a search runs over the buffer and maps its match back to a line"""
+
+    def __init__(self, lines):
+        self.buffer = ''.join(lines)
+        lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+        self.line_starts = np.zeros(len(lines) + 1, dtype=np.int64)  # line i spans line_starts[i:i+2]
+        np.cumsum(lengths, out=self.line_starts[1:])
+
+    def __len__(self):
+        """The number of lines"""
+        return len(self.line_starts) - 1
+
+    def line_of(self, offset):
+        """Number of the line holding buffer offset"""
+        return int(np.searchsorted(self.line_starts, offset, side='right')) - 1
+
+    def line_str(self, i):
+        """Text of line i"""
+        return self.buffer[self.line_starts[i]:self.line_starts[i + 1]]
+
+    def find(self, target, start_line=0):
+        """Number of first line from start_line containing target, -1 if none"""
+        if not 0 <= start_line < len(self):
+            return -1
+        position = self.buffer.find(target, self.line_starts[start_line])
+        while position >= 0:
+            line = self.line_of(position)
+            if position + len(target) <= self.line_starts[line + 1]:
+                return line
+            position = self.buffer.find(target, position + 1)  # match spanned lines
+        return -1
+
+
+class TokenStore(LineBuffer):
+    """Tokens of many lines held as one text buffer and NumPy offset arrays,
+    one row per token:  line, token_start, token_end, delim_start, delim_end.
+    Offsets index buffer; a token's delimiter runs to the next token of its line"""
+
+    def __init__(self, lines, delimiters, counts=None, bounds=None):
+        """Tokenize lines, unless already done giving counts and bounds of tokenize_lines"""
+        LineBuffer.__init__(self, lines)
+        self.delimiters = delimiters
+        if counts is None:
+            counts, bounds = tokenize_lines(lines, delimiters)
+        self.first_token = np.zeros(len(lines) + 1, dtype=np.int64)  # tokens of line i are rows first_token[i:i+2]
+        np.cumsum(counts, out=self.first_token[1:])
+        self.line = np.repeat(np.arange(len(lines), dtype=np.int32 if len(lines) < 2**31 else np.int64), counts)
+        # Offsets fit 32 bits unless the text is over 2 GB
+        offset_type = np.int32 if len(self.buffer) < 2**31 else np.int64
+        bounds = (bounds + self.line_starts[self.line][:, np.newaxis]).astype(offset_type)
+        self.token_start = bounds[:, 0]
+        self.token_end = bounds[:, 1]
+        # A delimiter runs to the next token of its line; the last of a line is empty
+        self.delim_start = self.token_end
+        self.delim_end = self.token_end.copy()
+        same_line = self.line[1:] == self.line[:-1]
+        self.delim_end[:-1][same_line] = self.token_start[1:][same_line]
+
+    def line_set(self, i):
+        """Read-only StringSet-like view of line i"""
+        if i < 0:
+            i += len(self)
+        return TokenView(self, i)
+
+    def tokens_per_line(self):
+        """Array of the number of tokens in each line"""
+        return np.diff(self.first_token)
+
+    def max_tokens(self):
+        """Number of tokens in the longest line"""
+        return int(self.tokens_per_line().max()) if len(self) else 0
+
+
+class TokenView:
+    """Tokens of one line of a TokenStore, read like a StringSet"""
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def str(self):
+        return self.store.line_str(self.index)
+
+    @property
+    def delimiters(self):
+        return self.store.delimiters
+
+    @property
+    def tokenized(self):
+        return 1
+
+    @property
+    def size_tokens(self):
+        return int(self.store.first_token[self.index + 1] - self.store.first_token[self.index])
+
+    size_delimiters = size_tokens
+
+    def _rows(self):
+        return slice(self.store.first_token[self.index], self.store.first_token[self.index + 1])
+
+    @property
+    def tokens(self):
+        rows = self._rows()
+        buffer = self.store.buffer
+        return [buffer[s:e] for s, e in zip(self.store.token_start[rows].tolist(), self.store.token_end[rows].tolist())]
+
+    @property
+    def delims(self):
+        rows = self._rows()
+        buffer = self.store.buffer
+        return [buffer[s:e] for s, e in zip(self.store.delim_start[rows].tolist(), self.store.delim_end[rows].tolist())]
+
+    def __len__(self):
+        """Number of tokens"""
+        return self.size_tokens
+
+    def __getitem__(self, j):
+        """Return a token"""
+        if not isinstance(j, int):
+            return self.tokens[j]
+        size = self.size_tokens
+        if j < 0:
+            j += size
+        if not 0 <= j < size:
+            raise IndexError('TokenView token index out of range')
+        row = self.store.first_token[self.index] + j
+        return self.store.buffer[self.store.token_start[row]:self.store.token_end[row]]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __eq__(self, other):
+        if isinstance(other, (StringSet, TokenView)):
+            return self.str == other.str and self.tokens == other.tokens and self.delims == other.delims
+        return False
+
+    def __repr__(self):
+        """Print like the equivalent StringSet"""
+        return repr(self.string_set())
+
+    def reconstruct(self):
+        """The line text"""
+        return self.str
+
+    def string_set(self):
+        """Editable StringSet of the line"""
+        return StringSet(self.str, self.delimiters)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(verbose=True)
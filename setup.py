@@ -59,6 +59,7 @@ setup(name='pyDAG3',
                      'System/tests/mySystem.dic',
                      'System/tests/pyDAG3.dic']},
       scripts=['pyDAG3/Apps/RotorDynamicModel/rotorModel.py',
+               'pyDAG3/Apps/RotorDynamicModel/rotorSweep.py',
                'pyDAG3/Apps/makeCMD/makeTBLADJ',
                'pyDAG3/Apps/makeCMD/map2tbl',
                'pyDAG3/Apps/makeCMD/ins2adj',
@@ -74,5 +75,6 @@ setup(name='pyDAG3',
       packages=['pyDAG3', 'pyDAG3.TextProcessing', 'pyDAG3.Dynamics', 'pyDAG3.Tables', 'pyDAG3.System',
                 'pyDAG3.Tkinter', 'pyDAG3.Control', 'pyDAG3.Control.Servo'],
       install_requires=['Pillow', 'twine', 'wheel', 'pip', 'setuptools', 'control', 'numpy',
-                        'matplotlib', 'scilab2py']
+                        'matplotlib'],
+      extras_require={'jit': ['numba']}
       )